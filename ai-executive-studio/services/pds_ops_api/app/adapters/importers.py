@@ -1,20 +1,86 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from io import StringIO
+from typing import IO, Iterable, Iterator
+import codecs
+import hashlib
 import json
 import pandas as pd
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from app.models.models import Project
+from app.db.database import in_batches
+from app.db.events import mark_changed
+from app.models.models import Client, Project
 
+CSV_CHUNK_ROWS = 5000
+JSON_BATCH_ROWS = 5000
+JSON_READ_SIZE = 1 << 16
+MAX_JSON_RECORD_CHARS = 16 << 20
+# Validation errors kept in the response; the total is always counted.
+MAX_REPORTED_ERRORS = 1000
 
-def _project_from_dict(payload: dict) -> Project:
-    return Project(
+_TEXT_COLUMNS = ("region", "sector")
+_DATE_COLUMNS = ("start_date", "end_date")
+_FLOAT_COLUMNS = ("baseline_budget", "current_forecast", "actual_spend", "percent_complete")
+_INT_COLUMNS = ("client_id", "baseline_schedule_days", "forecast_schedule_days", "safety_incidents")
+REQUIRED_COLUMNS = (
+    _INT_COLUMNS[:1] + _TEXT_COLUMNS + _DATE_COLUMNS + _FLOAT_COLUMNS + _INT_COLUMNS[1:]
+)
+_HASHED_COLUMNS = REQUIRED_COLUMNS + ("status",)
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def summary(self) -> dict:
+        return {
+            "imported": self.imported,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def _parse_date(value) -> date:
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    return pd.to_datetime(value).date()
+
+
+def _external_id(value) -> str | None:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _project_values(payload: dict) -> dict:
+    return dict(
+        external_id=_external_id(payload.get("external_id")),
         client_id=int(payload["client_id"]),
         region=payload["region"],
         sector=payload["sector"],
-        start_date=pd.to_datetime(payload["start_date"]).date(),
-        end_date=pd.to_datetime(payload["end_date"]).date(),
+        start_date=_parse_date(payload["start_date"]),
+        end_date=_parse_date(payload["end_date"]),
         baseline_budget=float(payload["baseline_budget"]),
         current_forecast=float(payload["current_forecast"]),
         actual_spend=float(payload["actual_spend"]),
@@ -26,23 +92,311 @@ def _project_from_dict(payload: dict) -> Project:
     )
 
 
-def import_projects_from_csv(content: str, db: Session) -> list[Project]:
-    df = pd.read_csv(StringIO(content))
-    projects = []
-    for _, row in df.iterrows():
-        project = _project_from_dict(row.to_dict())
-        projects.append(project)
-        db.add(project)
-    db.commit()
-    return projects
-
-
-def import_projects_from_json(content: str, db: Session) -> list[Project]:
-    data = json.loads(content)
-    projects = []
-    for payload in data:
-        project = _project_from_dict(payload)
-        projects.append(project)
-        db.add(project)
-    db.commit()
-    return projects
+def _project_from_dict(payload: dict) -> Project:
+    return Project(**_project_values(payload))
+
+
+def _insert_projects(db: Session, rows: list[dict]) -> list[int]:
+    return db.execute(insert(Project.__table__).returning(Project.id), rows).scalars().all()
+
+
+def _content_hash(values: dict) -> str:
+    content = json.dumps([values[name] for name in _HASHED_COLUMNS], default=str)
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
+
+
+def _write_projects(
+    db: Session, rows: list[tuple[int, dict]], result: ImportResult, upsert: bool
+) -> list[int]:
+    """Write validated ``(row, values)`` pairs and return the ids of inserted or updated projects.
+
+    Rows are matched to existing projects on ``external_id``. In upsert mode matched rows whose
+    content hash differs are updated in one bulk statement and identical ones are skipped; in
+    insert mode a matched row is reported as an error.
+    """
+    keyed: dict[str, tuple[int, dict]] = {}
+    inserts: list[dict] = []
+    for row, values in rows:
+        values["content_hash"] = _content_hash(values)
+        external_id = values["external_id"]
+        if external_id is None:
+            if upsert:
+                result.add_error(row, "external_id is required for upsert")
+            else:
+                inserts.append(values)
+        elif external_id in keyed:
+            result.add_error(row, f"duplicate external_id {external_id}")
+        else:
+            keyed[external_id] = (row, values)
+
+    existing = {}
+    for batch in in_batches(list(keyed)):
+        existing.update(
+            (external_id, (project_id, content_hash))
+            for project_id, external_id, content_hash in db.execute(
+                select(Project.id, Project.external_id, Project.content_hash).where(
+                    Project.external_id.in_(batch)
+                )
+            )
+        )
+    updates: list[dict] = []
+    now = datetime.utcnow()
+    for external_id, (row, values) in keyed.items():
+        match = existing.get(external_id)
+        if match is None:
+            inserts.append(values)
+        elif not upsert:
+            result.add_error(row, f"external_id {external_id} already exists")
+        elif match[1] == values["content_hash"]:
+            result.unchanged += 1
+        else:
+            updates.append({**values, "id": match[0], "last_updated": now})
+
+    ids = _insert_projects(db, inserts) if inserts else []
+    if updates:
+        db.execute(update(Project), updates)
+    result.inserted += len(ids)
+    result.updated += len(updates)
+    result.imported += len(ids) + len(updates)
+    return ids + [values["id"] for values in updates]
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    parsed = pd.to_datetime(values, errors="coerce")
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        # Fall back to per-value format inference only for rows the fast path rejected.
+        parsed[retry] = pd.to_datetime(values[retry], errors="coerce", format="mixed")
+    return parsed
+
+
+def _convert_chunk(frame: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """Vectorized type conversion; returns converted columns and the first error per row."""
+    errors = pd.Series("", index=frame.index, dtype=object)
+
+    def fail(mask: pd.Series, message: str) -> None:
+        errors[mask & (errors == "")] = message
+
+    columns: dict[str, pd.Series] = {}
+    for name in REQUIRED_COLUMNS:
+        raw = frame[name]
+        if name in _TEXT_COLUMNS:
+            values = raw.str.strip()
+            fail(values.isna() | (values == ""), f"{name} is required")
+        elif name in _DATE_COLUMNS:
+            values = _parse_dates(raw)
+            fail(values.isna(), f"{name} is not a valid date")
+        else:
+            values = pd.to_numeric(raw, errors="coerce")
+            if name in _INT_COLUMNS:
+                fail(values.isna() | (values % 1 != 0), f"{name} must be an integer")
+            else:
+                fail(values.isna(), f"{name} must be a number")
+        columns[name] = values
+    status = (
+        frame["status"] if "status" in frame else pd.Series(None, index=frame.index, dtype=object)
+    )
+    columns["status"] = status.where(status.notna() & (status != ""), "active")
+    # Blank when absent; converted to None per record since pandas would turn None into NaN.
+    external_ids = frame.get("external_id", pd.Series("", index=frame.index))
+    columns["external_id"] = external_ids.str.strip()
+    return pd.DataFrame(columns), errors
+
+
+def _known_clients(db: Session, client_ids: Iterable) -> set[int]:
+    wanted = list({int(client_id) for client_id in client_ids})
+    return set(db.scalars(select(Client.id).where(Client.id.in_(wanted)))) if wanted else set()
+
+
+def import_projects_from_csv(
+    source: str | IO, db: Session, chunk_size: int = CSV_CHUNK_ROWS, upsert: bool = False
+) -> ImportResult:
+    """Stream a CSV (text or file object) into projects, one bulk write and commit per chunk.
+
+    Rows that fail validation are reported in the result and skipped; each chunk's valid rows are
+    committed together, so memory stays flat for any file size. With ``upsert`` rows are matched
+    on the optional ``external_id`` column (see ``_write_projects``). Raises ``ValueError`` when
+    required columns are missing.
+    """
+    if isinstance(source, str):
+        source = StringIO(source)
+    result = ImportResult()
+    first_row = 1
+    chunks = pd.read_csv(
+        source, chunksize=chunk_size, dtype=str, keep_default_na=False, skipinitialspace=True
+    )
+    for chunk in chunks:
+        missing = [name for name in REQUIRED_COLUMNS if name not in chunk]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        chunk.index = pd.RangeIndex(first_row, first_row + len(chunk))
+        first_row += len(chunk)
+        converted, errors = _convert_chunk(chunk)
+        client_ids = converted["client_id"]
+        known = _known_clients(db, client_ids[errors == ""].unique())
+        unknown = (errors == "") & ~client_ids.isin(known)
+        errors[unknown] = [
+            f"client_id {int(value)} does not exist" for value in client_ids[unknown]
+        ]
+        for row, message in errors[errors != ""].items():
+            result.add_error(row, message)
+
+        valid = converted[errors == ""].copy()
+        if valid.empty:
+            continue
+        for name in _INT_COLUMNS:
+            valid[name] = valid[name].astype("int64")
+        for name in _FLOAT_COLUMNS:
+            valid[name] = valid[name].astype("float64")
+        for name in _DATE_COLUMNS:
+            valid[name] = valid[name].dt.date
+        names = list(valid.columns)
+        records = [dict(zip(names, row)) for row in zip(*(valid[name].tolist() for name in names))]
+        for record in records:
+            record["external_id"] = record["external_id"] or None
+        rows = list(zip(valid.index.tolist(), records))
+        ids = _write_projects(db, rows, result, upsert)
+        if ids:
+            mark_changed(db, "projects", ids, projects=ids)
+            db.commit()
+    return result
+
+
+def _skip_whitespace(buffer: str, position: int) -> int:
+    while position < len(buffer) and buffer[position] in " \t\r\n":
+        position += 1
+    return position
+
+
+def iter_json_records(
+    source: str | IO, read_size: int = JSON_READ_SIZE
+) -> Iterator[tuple[int, object]]:
+    """Yield ``(row, value)`` from a JSON array or newline-delimited JSON, reading incrementally.
+
+    NDJSON lines that fail to parse are yielded as ``JSONDecodeError`` values so callers can
+    report them and continue; a malformed JSON array raises ``ValueError``.
+    """
+    if isinstance(source, str):
+        source = StringIO(source)
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, position, eof = "", 0, False
+    array: bool | None = None
+    row = 0
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        text = ""
+        while not text:
+            chunk = source.read(read_size)
+            text = (
+                text_decoder.decode(chunk, final=not chunk) if isinstance(chunk, bytes) else chunk
+            )
+            if not chunk:
+                eof = True
+                return False
+        buffer, position = buffer[position:] + text, 0
+        if len(buffer) > MAX_JSON_RECORD_CHARS:
+            raise ValueError("JSON record exceeds the maximum supported size")
+        return True
+
+    while True:
+        position = _skip_whitespace(buffer, position)
+        if position == len(buffer):
+            if not fill():
+                break
+            continue
+        if array is None:
+            array = buffer[position] == "["
+            if array:
+                position += 1
+                continue
+        if array and buffer[position] in ",]":
+            if buffer[position] == "]":
+                position = _skip_whitespace(buffer, position + 1)
+                while position == len(buffer) and fill():
+                    position = _skip_whitespace(buffer, position)
+                if position != len(buffer):
+                    raise ValueError("Unexpected data after the JSON array")
+                return
+            position += 1
+            continue
+        if not array:
+            newline = buffer.find("\n", position)
+            while newline < 0 and fill():
+                newline = buffer.find("\n", position)
+            line = buffer[position:] if newline < 0 else buffer[position:newline]
+            position = len(buffer) if newline < 0 else newline + 1
+            row += 1
+            try:
+                yield row, json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield row, exc
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as exc:
+            # The value may just be cut off at the end of the buffer; read more and retry.
+            if fill():
+                continue
+            raise ValueError(f"Invalid JSON array: {exc.msg}") from exc
+        if end == len(buffer) and not eof and buffer[position] not in "{[\"":
+            # A bare number at the buffer edge may continue in the next chunk.
+            if fill():
+                continue
+        position = end
+        row += 1
+        yield row, value
+    if array:
+        raise ValueError("Invalid JSON array: missing closing bracket")
+
+
+def import_projects_from_json(
+    source: str | IO, db: Session, batch_size: int = JSON_BATCH_ROWS, upsert: bool = False
+) -> ImportResult:
+    """Import a JSON array or NDJSON stream, committing every ``batch_size`` valid rows.
+
+    ``upsert`` matches records on ``external_id`` as in ``import_projects_from_csv``. If the
+    stream cannot be read any further (a malformed or cut-off array), the records read so far are
+    still imported and the error is reported for the row after the last one read.
+    """
+    result = ImportResult()
+    batch: list[tuple[int, dict]] = []
+
+    def flush() -> None:
+        clients = _known_clients(db, (values["client_id"] for _, values in batch))
+        rows = []
+        for row, values in batch:
+            if values["client_id"] in clients:
+                rows.append((row, values))
+            else:
+                result.add_error(row, f"client_id {values['client_id']} does not exist")
+        ids = _write_projects(db, rows, result, upsert) if rows else []
+        if ids:
+            mark_changed(db, "projects", ids, projects=ids)
+            db.commit()
+        batch.clear()
+
+    row = 0
+    try:
+        for row, payload in iter_json_records(source):
+            if isinstance(payload, json.JSONDecodeError):
+                result.add_error(row, f"invalid JSON: {payload.msg}")
+                continue
+            if not isinstance(payload, dict):
+                result.add_error(row, "expected a JSON object")
+                continue
+            try:
+                batch.append((row, _project_values(payload)))
+            except KeyError as exc:
+                result.add_error(row, f"{exc.args[0]} is required")
+            except (TypeError, ValueError) as exc:
+                result.add_error(row, str(exc))
+            if len(batch) >= batch_size:
+                flush()
+    except ValueError as exc:
+        # Earlier batches are already committed, so report them alongside the error.
+        result.add_error(row + 1, str(exc))
+    if batch:
+        flush()
+    return result
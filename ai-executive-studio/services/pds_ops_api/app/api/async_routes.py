@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.routing import APIRoute
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import auth_guard, get_async_db
+from app.api.pagination import PageParams, page_params, paginate_json_async, where_equal
+from app.api.routes import (
+    CLIENT_SORTS,
+    DECISION_SORTS,
+    GAP_SORTS,
+    PROJECT_SORTS,
+    RESOURCE_SORTS,
+    RISK_SORTS,
+    TEMPLATE_SORTS,
+    project_filters,
+)
+from app.models.models import (
+    Client,
+    Decision,
+    GapInput,
+    ProcessTemplate,
+    Project,
+    Resource,
+    RiskItem,
+)
+from app.schemas.schemas import (
+    ClientRead,
+    DecisionRead,
+    GapInputRead,
+    ProcessTemplateRead,
+    ProjectRead,
+    ResourceRead,
+    RiskRead,
+)
+
+# Async versions of the I/O-bound read endpoints. They wait on the database without holding a
+# threadpool slot; writes and the CPU-bound analytics routes stay on the sync router.
+router = APIRouter()
+
+
+async def _get_or_404(db: AsyncSession, model, item_id: int, name: str):
+    item = await db.get(model, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail=f"{name} not found")
+    return item
+
+
+@router.get("/clients", response_model=list[ClientRead])
+async def list_clients(
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(auth_guard),
+):
+    return await paginate_json_async(db, select(Client), Client, ClientRead, page, CLIENT_SORTS)
+
+
+@router.get("/clients/{client_id}", response_model=ClientRead)
+async def get_client(
+    client_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(auth_guard)
+):
+    return await _get_or_404(db, Client, client_id, "Client")
+
+
+@router.get("/projects", response_model=list[ProjectRead])
+async def list_projects(
+    region: str | None = None,
+    sector: str | None = None,
+    status: str | None = None,
+    client_id: int | None = None,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(auth_guard),
+):
+    statement = select(Project).where(
+        *project_filters(region=region, sector=sector, status=status, client_id=client_id)
+    )
+    return await paginate_json_async(db, statement, Project, ProjectRead, page, PROJECT_SORTS)
+
+
+@router.get("/projects/{project_id}", response_model=ProjectRead)
+async def get_project(
+    project_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(auth_guard)
+):
+    return await _get_or_404(db, Project, project_id, "Project")
+
+
+@router.get("/resources", response_model=list[ResourceRead])
+async def list_resources(
+    region: str | None = None,
+    role: str | None = None,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(auth_guard),
+):
+    statement = select(Resource).where(
+        *where_equal((Resource.region, region), (Resource.role, role))
+    )
+    return await paginate_json_async(db, statement, Resource, ResourceRead, page, RESOURCE_SORTS)
+
+
+@router.get("/resources/{resource_id}", response_model=ResourceRead)
+async def get_resource(
+    resource_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(auth_guard)
+):
+    return await _get_or_404(db, Resource, resource_id, "Resource")
+
+
+@router.get("/risks", response_model=list[RiskRead])
+async def list_risks(
+    project_id: int | None = None,
+    category: str | None = None,
+    status: str | None = Query(default=None, description="Mitigation status"),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(auth_guard),
+):
+    statement = select(RiskItem).where(
+        *where_equal(
+            (RiskItem.project_id, project_id),
+            (RiskItem.category, category),
+            (RiskItem.mitigation_status, status),
+        )
+    )
+    return await paginate_json_async(db, statement, RiskItem, RiskRead, page, RISK_SORTS)
+
+
+@router.get("/risks/{risk_id}", response_model=RiskRead)
+async def get_risk(
+    risk_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(auth_guard)
+):
+    return await _get_or_404(db, RiskItem, risk_id, "Risk")
+
+
+@router.get("/decisions", response_model=list[DecisionRead])
+async def list_decisions(
+    status: str | None = None,
+    decision_type: str | None = None,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(auth_guard),
+):
+    statement = select(Decision).where(
+        *where_equal((Decision.status, status), (Decision.decision_type, decision_type))
+    )
+    return await paginate_json_async(db, statement, Decision, DecisionRead, page, DECISION_SORTS)
+
+
+@router.get("/decisions/{decision_id}", response_model=DecisionRead)
+async def get_decision(
+    decision_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(auth_guard)
+):
+    return await _get_or_404(db, Decision, decision_id, "Decision")
+
+
+@router.get("/process-templates", response_model=list[ProcessTemplateRead])
+async def list_templates(
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(auth_guard),
+):
+    statement = select(ProcessTemplate)
+    return await paginate_json_async(
+        db, statement, ProcessTemplate, ProcessTemplateRead, page, TEMPLATE_SORTS
+    )
+
+
+@router.get("/process-templates/{template_id}", response_model=ProcessTemplateRead)
+async def get_template(
+    template_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(auth_guard)
+):
+    return await _get_or_404(db, ProcessTemplate, template_id, "Template")
+
+
+@router.get("/gaps", response_model=list[GapInputRead])
+async def list_gaps(
+    category: str | None = None,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(auth_guard),
+):
+    statement = select(GapInput).where(*where_equal((GapInput.category, category)))
+    return await paginate_json_async(db, statement, GapInput, GapInputRead, page, GAP_SORTS)
+
+
+@router.get("/gaps/{gap_id}", response_model=GapInputRead)
+async def get_gap(
+    gap_id: int, db: AsyncSession = Depends(get_async_db), user=Depends(auth_guard)
+):
+    return await _get_or_404(db, GapInput, gap_id, "Gap")
+
+
+def with_async_reads(sync_router: APIRouter) -> APIRouter:
+    """Return ``sync_router`` with the handlers defined here swapped in for their sync versions."""
+    replaced = {(route.path, method) for route in router.routes for method in route.methods}
+    combined = APIRouter()
+    combined.routes.extend(router.routes)
+    combined.routes.extend(
+        route
+        for route in sync_router.routes
+        if not (
+            isinstance(route, APIRoute)
+            and any((route.path, method) in replaced for method in route.methods)
+        )
+    )
+    return combined
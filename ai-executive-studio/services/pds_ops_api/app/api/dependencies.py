@@ -1,16 +1,35 @@
 from __future__ import annotations
 
+import math
 import os
-from fastapi import Depends, HTTPException, status
+import time
+from typing import AsyncIterator
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.database import SessionLocal
+from app.core.config import get_settings
+from app.db.database import ReadSessionLocal, SessionLocal, get_async_sessionmaker
 
 security = HTTPBasic()
 
+# Holds the time until which this client's reads stay on the primary, set by any write request.
+READ_PRIMARY_COOKIE = "pds_read_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
-def get_db() -> Session:
+
+def get_db(request: Request, response: Response) -> Session:
+    """Session on the primary, used by CRUD routes and every mutation."""
+    if request.method not in SAFE_METHODS and ReadSessionLocal is not SessionLocal:
+        sticky_seconds = get_settings().database_read_sticky_seconds
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            f"{time.time() + sticky_seconds:.3f}",
+            max_age=math.ceil(sticky_seconds),
+            httponly=True,
+            samesite="lax",
+        )
     db = SessionLocal()
     try:
         yield db
@@ -18,12 +37,46 @@ def get_db() -> Session:
         db.close()
 
 
-def auth_guard(credentials: HTTPBasicCredentials = Depends(security)) -> dict:
-    username = os.getenv("AUTH_USER", "admin")
-    password = os.getenv("AUTH_PASS", "admin")
-    if credentials.username != username or credentials.password != password:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+def _reads_from_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request) -> Session:
+    """Session on the read replica for analytics and report reads.
+
+    Clients that wrote within the last ``DATABASE_READ_STICKY_SECONDS`` read from the primary
+    instead, so they see their own writes before the replica has caught up.
+    """
+    sessions = SessionLocal if _reads_from_primary(request) else ReadSessionLocal
+    db = sessions()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+def authenticate(username: str, password: str) -> dict | None:
+    expected_username = os.getenv("AUTH_USER", "admin")
+    expected_password = os.getenv("AUTH_PASS", "admin")
+    if username != expected_username or password != expected_password:
+        return None
     role_map = {
-        username: os.getenv("AUTH_ROLE", "admin")
+        expected_username: os.getenv("AUTH_ROLE", "admin")
     }
-    return {"user": credentials.username, "role": role_map.get(credentials.username, "analyst")}
+    return {"user": username, "role": role_map.get(username, "analyst")}
+
+
+# Async so it runs on the event loop instead of taking a threadpool slot per request.
+async def auth_guard(credentials: HTTPBasicCredentials = Depends(security)) -> dict:
+    user = authenticate(credentials.username, credentials.password)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    return user
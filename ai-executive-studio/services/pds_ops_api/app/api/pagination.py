@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Mapping
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as OrmQuery
+
+from app.api.serialization import json_rows, read_columns
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: str | None = None
+    sort: str = "id"
+
+
+async def page_params(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    sort: str = Query(default="id", description="Sort field; prefix with '-' for descending"),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, sort=sort)
+
+
+def encode_cursor(sort: str, value: Any, row_id: int) -> str:
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, column) -> tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort or not isinstance(row_id, int):
+            raise ValueError("cursor does not match the requested sort")
+        python_type = column.type.python_type
+        if value is not None and python_type in (date, datetime):
+            value = python_type.fromisoformat(value)
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    return value, row_id
+
+
+def where_equal(*filters: tuple[Any, Any]) -> list:
+    """Equality conditions for the ``(column, value)`` pairs whose value was given."""
+    return [column == value for column, value in filters if value is not None]
+
+
+def _keyset(query, model, page: PageParams, sortable: Mapping[str, Any] | None):
+    descending = page.sort.startswith("-")
+    name = page.sort.lstrip("-")
+    columns = {"id": model.id, **(sortable or {})}
+    if name not in columns:
+        allowed = ", ".join(sorted(columns))
+        detail = f"Cannot sort by '{name}'; use one of: {allowed}"
+        raise HTTPException(status_code=400, detail=detail)
+    column = columns[name]
+    keys = [column, model.id] if name != "id" else [model.id]
+
+    if page.cursor:
+        value, row_id = decode_cursor(page.cursor, page.sort, column)
+        if name == "id":
+            query = query.filter(model.id < row_id if descending else model.id > row_id)
+        elif descending:
+            query = query.filter(or_(column < value, and_(column == value, model.id < row_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, model.id > row_id)))
+    order = [key.desc() for key in keys] if descending else keys
+    return query.order_by(*order).limit(page.limit + 1), column
+
+
+def _split_page(rows: list, page: PageParams, column) -> tuple[list, dict[str, str]]:
+    if len(rows) <= page.limit:
+        return rows, {}
+    rows = rows[: page.limit]
+    last = rows[-1]
+    return rows, {NEXT_CURSOR_HEADER: encode_cursor(page.sort, getattr(last, column.key), last.id)}
+
+
+def _finish_page(rows: list, page: PageParams, response: Response, column) -> list:
+    rows, headers = _split_page(rows, page, column)
+    response.headers.update(headers)
+    return rows
+
+
+def paginate(
+    query: OrmQuery,
+    model,
+    page: PageParams,
+    response: Response,
+    sortable: Mapping[str, Any] | None = None,
+) -> list:
+    """Return one page of ``query`` ordered by the sort field and then id.
+
+    Pages are selected with a keyset condition on ``(sort value, id)`` instead of an offset, so
+    each page costs the same however deep the client has paged. When more rows follow, the
+    cursor for the next page is returned in the ``X-Next-Cursor`` header. Only columns listed in
+    ``sortable`` (plus ``id``) can be sorted on; they should be NOT NULL and indexed.
+    """
+    query, column = _keyset(query, model, page, sortable)
+    return _finish_page(query.all(), page, response, column)
+
+
+def paginate_json(
+    query: OrmQuery,
+    model,
+    schema: type[BaseModel],
+    page: PageParams,
+    sortable: Mapping[str, Any] | None = None,
+) -> Response:
+    """``paginate`` selecting only ``schema``'s columns and returning the page as JSON bytes."""
+    query = query.with_entities(*read_columns(model, schema))
+    query, column = _keyset(query, model, page, sortable)
+    rows, headers = _split_page(query.all(), page, column)
+    return json_rows(rows, schema, headers)
+
+
+async def paginate_json_async(
+    db: AsyncSession,
+    statement: Select,
+    model,
+    schema: type[BaseModel],
+    page: PageParams,
+    sortable: Mapping[str, Any] | None = None,
+) -> Response:
+    """``paginate_json`` for a ``select(model)`` statement on an async session."""
+    statement = statement.with_only_columns(*read_columns(model, schema))
+    statement, column = _keyset(statement, model, page, sortable)
+    rows, headers = _split_page((await db.execute(statement)).all(), page, column)
+    return json_rows(rows, schema, headers)
@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Iterable, Protocol
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.dependencies import authenticate
+from app.core.config import get_settings
+from app.db.database import SessionLocal
+from app.db.events import ChangeSet, on_commit, read_versions
+from app.engine.snapshot import SNAPSHOT_TABLES
+
+# Cached GET routes and the tables their responses are built from. A commit touching any of those
+# tables invalidates every cached response of the route.
+CACHED_ROUTES: dict[str, tuple[str, ...]] = {
+    "/clients": ("clients",),
+    "/clients/{client_id}": ("clients",),
+    "/projects": ("projects",),
+    "/projects/{project_id}": ("projects",),
+    "/resources": ("resources",),
+    "/resources/{resource_id}": ("resources",),
+    "/risks": ("risks",),
+    "/risks/{risk_id}": ("risks",),
+    "/decisions": ("decisions",),
+    "/decisions/{decision_id}": ("decisions",),
+    "/process-templates": ("process_templates",),
+    "/process-templates/{template_id}": ("process_templates",),
+    "/gaps": ("gap_inputs",),
+    "/gaps/{gap_id}": ("gap_inputs",),
+    "/analytics/kpis": SNAPSHOT_TABLES,
+    "/analytics/portfolio-ranking": SNAPSHOT_TABLES,
+    "/recommendations": SNAPSHOT_TABLES + ("process_templates", "rule_feedback"),
+}
+CACHE_CONTROL = "private, no-cache"
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None: ...
+
+    def versions(self, names: list[str]) -> list[int]: ...
+
+    def bump(self, names: Iterable[str]) -> None: ...
+
+
+class MemoryBackend:
+    """Per-process LRU; table versions are kept apart so evicting entries never resets them.
+
+    With ``sessions`` (a session factory on the primary database) the versions are the
+    ``data_versions`` counters, so commits made by other worker processes invalidate this
+    process's entries too. Without it only this process's commits bump them.
+    """
+
+    def __init__(self, max_entries: int = 1024, sessions: Callable[[], Session] | None = None):
+        self.max_entries = max_entries
+        self.sessions = sessions
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, names: list[str]) -> list[int]:
+        if self.sessions is not None:
+            with self.sessions() as db:
+                versions = read_versions(db, names)
+            return [versions[name] for name in names]
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def bump(self, names: Iterable[str]) -> None:
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+
+class RedisBackend:
+    """Backend on a redis-py compatible client, shared by every worker using the same server.
+
+    Table versions are stored without an expiry; run Redis with a ``volatile-*`` eviction policy
+    so they are never evicted, or old entries could become current again.
+    """
+
+    def __init__(self, client, prefix: str = "pds:response-cache:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self.client.set(self.prefix + key, value, ex=math.ceil(ttl_seconds))
+
+    def versions(self, names: list[str]) -> list[int]:
+        values = self.client.mget([f"{self.prefix}version:{name}" for name in names])
+        return [int(value or 0) for value in values]
+
+    def bump(self, names: Iterable[str]) -> None:
+        for name in names:
+            self.client.incr(f"{self.prefix}version:{name}")
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of the redis-py client that ``RedisBackend`` uses."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[float | None, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None or (entry[0] is not None and entry[0] < time.monotonic()):
+            self._data.pop(key, None)
+            return None
+        return entry[1]
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            return self._get(key)
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        with self._lock:
+            return [self._get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        with self._lock:
+            expires = time.monotonic() + ex if ex is not None else None
+            self._data[key] = (expires, value if isinstance(value, bytes) else str(value).encode())
+            return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._get(key) or 0) + 1
+            self._data[key] = (None, str(value).encode())
+            return value
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: list[tuple[str, str]]
+    etag: str
+
+    def dumps(self) -> bytes:
+        head = json.dumps({"headers": self.headers, "etag": self.etag}).encode()
+        return head + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> CachedResponse:
+        head, body = data.split(b"\n", 1)
+        meta = json.loads(head)
+        return cls(body, [tuple(header) for header in meta["headers"]], meta["etag"])
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return any(tag in (etag, "*") for tag in tags)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: float | None = None,
+        routes: dict[str, tuple[str, ...]] | None = None,
+    ) -> None:
+        self.backend = backend
+        self.ttl_seconds = (
+            get_settings().response_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self._routes = [
+            (compile_path(path)[0], tables) for path, tables in (routes or CACHED_ROUTES).items()
+        ]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def tables_for(self, path: str) -> tuple[str, ...] | None:
+        for pattern, tables in self._routes:
+            if pattern.match(path):
+                return tables
+        return None
+
+    def key(self, path: str, query_string: bytes, role: str, tables: tuple[str, ...]) -> str:
+        query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+        # Versions are read before the response is built, so a response computed while a write
+        # commits is stored under the old versions and never served afterwards. The date covers
+        # analytics computed as of today.
+        versions = self.backend.versions(list(tables))
+        raw = json.dumps([path, query, role, date.today().isoformat(), versions])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        data = self.backend.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return CachedResponse.loads(data)
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        self.backend.set(key, response.dumps(), self.ttl_seconds)
+
+    def count_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, changes: ChangeSet) -> None:
+        self.backend.bump(changes.tables)
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> dict[str, int | str]:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+            }
+
+
+def _backend_from_settings() -> CacheBackend:
+    settings = get_settings()
+    if settings.response_cache_backend != "redis":
+        return MemoryBackend(settings.response_cache_size, sessions=SessionLocal)
+    try:
+        import redis
+    except ImportError as exc:
+        raise RuntimeError(
+            "RESPONSE_CACHE_BACKEND=redis requires the redis client (pip install -e .[redis])"
+        ) from exc
+    return RedisBackend(redis.Redis.from_url(settings.response_cache_redis_url))
+
+
+response_cache = ResponseCache(_backend_from_settings())
+
+
+@on_commit
+def _invalidate_responses(changes: ChangeSet) -> None:
+    response_cache.invalidate(changes)
+
+
+def _role(authorization: str | None) -> str | None:
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "basic":
+        return None
+    try:
+        username, _, password = base64.b64decode(credentials).decode().partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    user = authenticate(username, password)
+    return user["role"] if user else None
+
+
+async def _send_cached(send: Send, cached: CachedResponse, status: int) -> None:
+    headers = [("etag", cached.etag), ("cache-control", CACHE_CONTROL)]
+    body = b""
+    if status == 200:
+        headers = cached.headers + headers + [("content-length", str(len(cached.body)))]
+        body = cached.body
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (name.encode("latin-1"), value.encode("latin-1")) for name, value in headers
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class ResponseCacheMiddleware:
+    """Serves authenticated GETs of ``CACHED_ROUTES`` from stored response bytes.
+
+    Entries are keyed on path, sorted query string, the caller's role and the versions of the
+    tables the route reads. Responses carry a strong ETag and ``Cache-Control: private, no-cache``
+    so browsers revalidate, and a matching ``If-None-Match`` gets a 304 without a body.
+    Unauthenticated requests pass straight through to the app.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache | None = None) -> None:
+        self.app = app
+        self.cache = cache or response_cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        tables = self.cache.tables_for(scope["path"])
+        headers = Headers(scope=scope)
+        role = _role(headers.get("authorization")) if tables is not None else None
+        if role is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.cache.key(scope["path"], scope["query_string"], role, tables)
+        if_none_match = headers.get("if-none-match")
+        cached = self.cache.get(key)
+        if cached is None:
+            messages: list[Message] = []
+
+            async def capture(message: Message) -> None:
+                messages.append(message)
+
+            await self.app(scope, receive, capture)
+            cached = self._store(key, messages)
+            if cached is None:
+                for message in messages:
+                    await send(message)
+                return
+        if etag_matches(if_none_match, cached.etag):
+            self.cache.count_not_modified()
+            await _send_cached(send, cached, 304)
+        else:
+            await _send_cached(send, cached, 200)
+
+    def _store(self, key: str, messages: list[Message]) -> CachedResponse | None:
+        start = messages[0]
+        response_headers = [
+            (name.decode("latin-1"), value.decode("latin-1")) for name, value in start["headers"]
+        ]
+        names = {name for name, _ in response_headers}
+        if start["status"] != 200 or names & {"etag", "set-cookie", "cache-control"}:
+            return None
+        body = b"".join(
+            message.get("body", b"")
+            for message in messages
+            if message["type"] == "http.response.body"
+        )
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        kept = [(name, value) for name, value in response_headers if name != "content-length"]
+        cached = CachedResponse(body, kept, etag)
+        self.cache.set(key, cached)
+        return cached
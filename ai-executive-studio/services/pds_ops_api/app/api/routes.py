@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
-
-from app.api.dependencies import get_db, auth_guard
+from datetime import date, datetime, timedelta
+from typing import Literal
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.dependencies import get_db, get_read_db, auth_guard
+from app.api.pagination import PageParams, page_params, paginate_json, where_equal
+from app.api.response_cache import response_cache
+from app.db.database import database_pool_stats
 from app.models.models import (
     Project,
     Client,
@@ -15,6 +20,7 @@ from app.models.models import (
     ProcessTemplate,
     GapInput,
     RuleFeedback,
+    KPISnapshot,
 )
 from app.schemas.schemas import (
     ProjectCreate,
@@ -34,22 +40,77 @@ from app.schemas.schemas import (
     GapInputCreate,
     GapInputRead,
     PortfolioKPIResponse,
+    KPIHistoryPoint,
     ScenarioResult,
+    ScenarioSweepRequest,
+    ScenarioSweepResult,
+    PortfolioScenarioResult,
     RecommendationRead,
     ExecutiveBrief,
 )
-from app.engine.analytics import calculate_kpi, portfolio_totals, portfolio_ranking, monte_carlo
-from app.engine.recommendations import generate_recommendations, update_rule_feedback
-from app.adapters.importers import import_projects_from_csv, import_projects_from_json
+from app.engine.analytics import (
+    monte_carlo,
+    scenario_sweep,
+    snapshot_kpis,
+    snapshot_totals,
+)
+from app.engine.brief import brief_store
+from app.engine.cache import scenario_cache
+from app.engine.correlation import CorrelationModel
+from app.engine.history import kpi_history
+from app.engine.parallel import scenario_executor, project_plan, portfolio_plan
+from app.engine.ranking import ranking_index
+from app.engine.recommendations import recommend_from_snapshot, update_rule_feedback
+from app.engine.snapshot import portfolio_snapshot
+from app.adapters.importers import (
+    JSON_BATCH_ROWS,
+    import_projects_from_csv,
+    import_projects_from_json,
+)
 
 router = APIRouter()
 
+# Sortable fields per list endpoint (besides id); shared with the async read routes.
+CLIENT_SORTS = {"name": Client.name}
+PROJECT_SORTS = {
+    "region": Project.region,
+    "sector": Project.sector,
+    "start_date": Project.start_date,
+    "end_date": Project.end_date,
+}
+RESOURCE_SORTS = {"name": Resource.name, "role": Resource.role, "region": Resource.region}
+RISK_SORTS = {"project_id": RiskItem.project_id, "category": RiskItem.category}
+DECISION_SORTS = {"decision_type": Decision.decision_type}
+TEMPLATE_SORTS = {"name": ProcessTemplate.name}
+GAP_SORTS = {"category": GapInput.category}
+
+
+def project_filters(
+    region: str | None, sector: str | None, status: str | None, client_id: int | None
+) -> list:
+    return where_equal(
+        (Project.region, region),
+        (Project.sector, sector),
+        (Project.status, status),
+        (Project.client_id, client_id),
+    )
+
 
 @router.get("/health")
 def health() -> dict:
     return {"status": "ok"}
 
 
+@router.get("/database/metrics")
+def database_metrics(user=Depends(auth_guard)) -> dict:
+    return database_pool_stats()
+
+
+@router.get("/response-cache/metrics")
+def response_cache_metrics(user=Depends(auth_guard)) -> dict:
+    return response_cache.stats()
+
+
 @router.post("/auth/login")
 def login(user=Depends(auth_guard)) -> dict:
     return {"user": user}
@@ -65,8 +126,12 @@ def create_client(payload: ClientCreate, db: Session = Depends(get_db), user=Dep
 
 
 @router.get("/clients", response_model=list[ClientRead])
-def list_clients(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    return db.query(Client).all()
+def list_clients(
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    return paginate_json(db.query(Client), Client, ClientRead, page, CLIENT_SORTS)
 
 
 @router.get("/clients/{client_id}", response_model=ClientRead)
@@ -109,8 +174,19 @@ def create_project(payload: ProjectCreate, db: Session = Depends(get_db), user=D
 
 
 @router.get("/projects", response_model=list[ProjectRead])
-def list_projects(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    return db.query(Project).all()
+def list_projects(
+    region: str | None = None,
+    sector: str | None = None,
+    status: str | None = None,
+    client_id: int | None = None,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    query = db.query(Project).filter(
+        *project_filters(region=region, sector=sector, status=status, client_id=client_id)
+    )
+    return paginate_json(query, Project, ProjectRead, page, PROJECT_SORTS)
 
 
 @router.get("/projects/{project_id}", response_model=ProjectRead)
@@ -130,6 +206,8 @@ def update_project(
         raise HTTPException(status_code=404, detail="Project not found")
     for key, value in payload.model_dump().items():
         setattr(project, key, value)
+    # The next upsert import rewrites the project instead of trusting the old import hash.
+    project.content_hash = None
     db.commit()
     db.refresh(project)
     return project
@@ -140,23 +218,38 @@ def delete_project(project_id: int, db: Session = Depends(get_db), user=Depends(
     project = db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    db.query(KPISnapshot).filter(KPISnapshot.project_id == project_id).delete()
     db.delete(project)
     db.commit()
     return {"status": "deleted"}
 
 
 @router.post("/projects/import")
-def import_projects(file: UploadFile = File(...), db: Session = Depends(get_db), user=Depends(auth_guard)):
-    content = file.file.read().decode("utf-8")
-    projects = import_projects_from_csv(content, db)
-    return {"imported": len(projects)}
+def import_projects(
+    file: UploadFile = File(...),
+    mode: Literal["insert", "upsert"] = Query(default="insert"),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    try:
+        result = import_projects_from_csv(file.file, db, upsert=mode == "upsert")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return result.summary()
 
 
 @router.post("/projects/import-json")
-def import_projects_json(file: UploadFile = File(...), db: Session = Depends(get_db), user=Depends(auth_guard)):
-    content = file.file.read().decode("utf-8")
-    projects = import_projects_from_json(content, db)
-    return {"imported": len(projects)}
+def import_projects_json(
+    file: UploadFile = File(...),
+    batch_size: int = Query(default=JSON_BATCH_ROWS, ge=1),
+    mode: Literal["insert", "upsert"] = Query(default="insert"),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    result = import_projects_from_json(
+        file.file, db, batch_size=batch_size, upsert=mode == "upsert"
+    )
+    return result.summary()
 
 
 @router.post("/resources", response_model=ResourceRead)
@@ -169,8 +262,16 @@ def create_resource(payload: ResourceCreate, db: Session = Depends(get_db), user
 
 
 @router.get("/resources", response_model=list[ResourceRead])
-def list_resources(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    return db.query(Resource).all()
+def list_resources(
+    region: str | None = None,
+    role: str | None = None,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    filters = where_equal((Resource.region, region), (Resource.role, role))
+    query = db.query(Resource).filter(*filters)
+    return paginate_json(query, Resource, ResourceRead, page, RESOURCE_SORTS)
 
 
 @router.get("/resources/{resource_id}", response_model=ResourceRead)
@@ -215,8 +316,22 @@ def create_risk(payload: RiskCreate, db: Session = Depends(get_db), user=Depends
 
 
 @router.get("/risks", response_model=list[RiskRead])
-def list_risks(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    return db.query(RiskItem).all()
+def list_risks(
+    project_id: int | None = None,
+    category: str | None = None,
+    status: str | None = Query(default=None, description="Mitigation status"),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    query = db.query(RiskItem).filter(
+        *where_equal(
+            (RiskItem.project_id, project_id),
+            (RiskItem.category, category),
+            (RiskItem.mitigation_status, status),
+        )
+    )
+    return paginate_json(query, RiskItem, RiskRead, page, RISK_SORTS)
 
 
 @router.get("/risks/{risk_id}", response_model=RiskRead)
@@ -249,62 +364,117 @@ def delete_risk(risk_id: int, db: Session = Depends(get_db), user=Depends(auth_g
     return {"status": "deleted"}
 
 
+# The snapshot-backed analytics stay on the primary: the snapshot is invalidated by primary
+# commits, and refreshing it from a lagging replica would cache rows older than the change.
 @router.get("/analytics/kpis", response_model=PortfolioKPIResponse)
 def analytics_kpis(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    projects = db.query(Project).all()
-    kpis = [calculate_kpi(project) for project in projects]
-    totals = portfolio_totals(kpis)
+    kpis = snapshot_kpis(portfolio_snapshot.get(db))
+    columns = {name: values.tolist() for name, values in kpis.items()}
     return PortfolioKPIResponse(
-        kpis=[
-            {
-                "project_id": kpi.project_id,
-                "ev": kpi.ev,
-                "ac": kpi.ac,
-                "pv": kpi.pv,
-                "cv": kpi.cv,
-                "sv": kpi.sv,
-                "cpi": kpi.cpi,
-                "spi": kpi.spi,
-            }
-            for kpi in kpis
-        ],
-        totals=totals,
+        kpis=[dict(zip(columns, row)) for row in zip(*columns.values())],
+        totals=snapshot_totals(kpis),
     )
 
 
+@router.get("/analytics/kpis/history", response_model=list[KPIHistoryPoint])
+def analytics_kpi_history(
+    project_id: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(get_read_db),
+    user=Depends(auth_guard),
+):
+    end = end or date.today()
+    start = start or end - timedelta(days=90)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return kpi_history(db, start, end, project_id)
+
+
 @router.get("/analytics/portfolio-ranking")
-def analytics_portfolio_ranking(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    projects = db.query(Project).all()
-    risks = db.query(RiskItem).all()
-    return {"ranking": portfolio_ranking(projects, risks)}
+def analytics_portfolio_ranking(
+    limit: int | None = Query(default=None, ge=1),
+    offset: int = Query(default=0, ge=0),
+    region: str | None = None,
+    sector: str | None = None,
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    ranking, total = ranking_index.top(db, limit=limit, offset=offset, region=region, sector=sector)
+    return {"ranking": ranking, "total": total}
+
+
+def _load_scenario_inputs(
+    db: Session, project_id: int | None
+) -> list[tuple[Project, list[RiskItem]]]:
+    query = db.query(Project).options(selectinload(Project.risks))
+    projects = query.all() if project_id is None else query.filter(Project.id == project_id).all()
+    return [(project, list(project.risks)) for project in projects]
+
+
+def _correlation_model(category: float, region: float) -> CorrelationModel:
+    try:
+        return CorrelationModel(category=category, region=region)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.get("/analytics/scenario", response_model=list[ScenarioResult])
-def analytics_scenario(
+async def analytics_scenario(
     project_id: int | None = None,
     iterations: int = 1000,
     inflation_factor: float = 1.0,
     staffing_capacity_factor: float = 1.0,
     risk_mitigation_effectiveness: float = 1.0,
     seed: int | None = None,
-    db: Session = Depends(get_db),
+    sampler: Literal["random", "lhs", "sobol"] = "random",
+    tolerance: float | None = None,
+    max_iterations: int = Query(default=1_000_000, ge=1, le=1_000_000),
+    percentiles: list[float] = Query(default=[50.0, 80.0]),
+    streaming: bool = False,
+    category_correlation: float = 0.0,
+    region_correlation: float = 0.0,
+    db: Session = Depends(get_read_db),
     user=Depends(auth_guard),
 ):
+    correlation = _correlation_model(category_correlation, region_correlation)
     results = []
-    projects = db.query(Project).all() if project_id is None else [db.get(Project, project_id)]
-    for project in projects:
-        if not project:
-            continue
-        risks = db.query(RiskItem).filter(RiskItem.project_id == project.id).all()
-        output = monte_carlo(
-            project,
-            risks,
+    inputs = await run_in_threadpool(_load_scenario_inputs, db, project_id)
+    for project, risks in inputs:
+        params = dict(
             iterations=iterations,
             inflation_factor=inflation_factor,
             staffing_capacity_factor=staffing_capacity_factor,
             risk_mitigation_effectiveness=risk_mitigation_effectiveness,
             seed=seed,
+            sampler=sampler,
+            percentiles=tuple(percentiles),
+            streaming=streaming,
+            correlation=correlation,
+        )
+        cache_key = scenario_cache.key(
+            project, risks, tolerance=tolerance, max_iterations=max_iterations, **params
         )
+        output = scenario_cache.get(cache_key)
+        if output is None:
+            try:
+                # The sharded pool run and the single-stream tolerance run draw different
+                # streams from the same seed, so their results are not comparable.
+                if tolerance is None:
+                    plan = project_plan(project, risks, **params)
+                    output = await scenario_executor.run_async(plan)
+                else:
+                    output = await run_in_threadpool(
+                        monte_carlo,
+                        project,
+                        risks,
+                        tolerance=tolerance,
+                        max_iterations=max_iterations,
+                        **params,
+                    )
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
+            scenario_cache.set(cache_key, output)
         results.append(
             ScenarioResult(
                 project_id=project.id,
@@ -312,19 +482,89 @@ def analytics_scenario(
                 p80_cost=output["p80_cost"],
                 p50_days=output["p50_days"],
                 p80_days=output["p80_days"],
-                iterations=iterations,
+                iterations=output.get("iterations", iterations),
+                convergence=output.get("convergence"),
+                percentiles={
+                    key: value
+                    for key, value in output.items()
+                    if key.startswith("p") and isinstance(value, float)
+                },
+                error_bounds=output.get("error_bounds"),
             )
         )
     return results
 
 
+@router.post("/analytics/scenario/sweep", response_model=ScenarioSweepResult)
+def analytics_scenario_sweep(
+    payload: ScenarioSweepRequest, db: Session = Depends(get_read_db), user=Depends(auth_guard)
+):
+    project = db.get(Project, payload.project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    risks = db.query(RiskItem).filter(RiskItem.project_id == project.id).all()
+    grid = scenario_sweep(
+        project,
+        risks,
+        inflation_factors=payload.inflation_factors,
+        staffing_capacity_factors=payload.staffing_capacity_factors,
+        risk_mitigation_effectiveness=payload.risk_mitigation_effectiveness,
+        iterations=payload.iterations,
+        seed=payload.seed,
+    )
+    return ScenarioSweepResult(**payload.model_dump(), **grid)
+
+
+@router.get("/analytics/scenario/cache")
+def analytics_scenario_cache(user=Depends(auth_guard)) -> dict:
+    return scenario_cache.stats()
+
+
+def _load_portfolio_inputs(db: Session) -> tuple[list[Project], list[RiskItem]]:
+    return db.query(Project).all(), db.query(RiskItem).all()
+
+
+@router.get("/analytics/scenario/portfolio", response_model=PortfolioScenarioResult)
+async def analytics_scenario_portfolio(
+    iterations: int = 1000,
+    inflation_factor: float = 1.0,
+    staffing_capacity_factor: float = 1.0,
+    risk_mitigation_effectiveness: float = 1.0,
+    seed: int | None = None,
+    category_correlation: float = 0.0,
+    region_correlation: float = 0.0,
+    db: Session = Depends(get_read_db),
+    user=Depends(auth_guard),
+):
+    correlation = _correlation_model(category_correlation, region_correlation)
+    projects, risks = await run_in_threadpool(_load_portfolio_inputs, db)
+    try:
+        plan = portfolio_plan(
+            projects,
+            risks,
+            iterations=iterations,
+            inflation_factor=inflation_factor,
+            staffing_capacity_factor=staffing_capacity_factor,
+            risk_mitigation_effectiveness=risk_mitigation_effectiveness,
+            seed=seed,
+            correlation=correlation,
+        )
+        output = await scenario_executor.run_async(plan)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return PortfolioScenarioResult(
+        projects=[ScenarioResult(iterations=iterations, **item) for item in output["projects"]],
+        p50_cost=output["p50_cost"],
+        p80_cost=output["p80_cost"],
+        iterations=iterations,
+    )
+
+
 @router.get("/recommendations", response_model=list[RecommendationRead])
 def list_recommendations(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    projects = db.query(Project).all()
-    risks = db.query(RiskItem).all()
     templates = db.query(ProcessTemplate).all()
     feedback = db.query(RuleFeedback).all()
-    recommendations = generate_recommendations(projects, risks, templates, feedback)
+    recommendations = recommend_from_snapshot(portfolio_snapshot.get(db), templates, feedback)
     return [
         RecommendationRead(
             decision_type=rec.decision_type,
@@ -347,8 +587,17 @@ def create_decision(payload: DecisionCreate, db: Session = Depends(get_db), user
 
 
 @router.get("/decisions", response_model=list[DecisionRead])
-def list_decisions(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    return db.query(Decision).all()
+def list_decisions(
+    status: str | None = None,
+    decision_type: str | None = None,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    query = db.query(Decision).filter(
+        *where_equal((Decision.status, status), (Decision.decision_type, decision_type))
+    )
+    return paginate_json(query, Decision, DecisionRead, page, DECISION_SORTS)
 
 
 @router.get("/decisions/{decision_id}", response_model=DecisionRead)
@@ -413,8 +662,13 @@ def create_template(payload: ProcessTemplateCreate, db: Session = Depends(get_db
 
 
 @router.get("/process-templates", response_model=list[ProcessTemplateRead])
-def list_templates(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    return db.query(ProcessTemplate).all()
+def list_templates(
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    query = db.query(ProcessTemplate)
+    return paginate_json(query, ProcessTemplate, ProcessTemplateRead, page, TEMPLATE_SORTS)
 
 
 @router.get("/process-templates/{template_id}", response_model=ProcessTemplateRead)
@@ -459,8 +713,14 @@ def create_gap(payload: GapInputCreate, db: Session = Depends(get_db), user=Depe
 
 
 @router.get("/gaps", response_model=list[GapInputRead])
-def list_gaps(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    return db.query(GapInput).all()
+def list_gaps(
+    category: str | None = None,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    user=Depends(auth_guard),
+):
+    query = db.query(GapInput).filter(*where_equal((GapInput.category, category)))
+    return paginate_json(query, GapInput, GapInputRead, page, GAP_SORTS)
 
 
 @router.get("/gaps/{gap_id}", response_model=GapInputRead)
@@ -494,33 +754,21 @@ def delete_gap(gap_id: int, db: Session = Depends(get_db), user=Depends(auth_gua
 
 
 @router.get("/reports/executive-brief", response_model=ExecutiveBrief)
-def executive_brief(db: Session = Depends(get_db), user=Depends(auth_guard)):
-    projects = db.query(Project).all()
-    risks = db.query(RiskItem).all()
-    templates = db.query(ProcessTemplate).all()
-    feedback = db.query(RuleFeedback).all()
-    recommendations = generate_recommendations(projects, risks, templates, feedback)
-    total_projects = len(projects)
-    high_risk = len([r for r in risks if r.probability > 0.6])
-    summary = f"Portfolio tracking {total_projects} projects with {high_risk} high-risk items."
-    markdown = f"# Executive Brief\n\n{summary}\n\n## Recommendations\n" + "\n".join(
-        [f"- {rec.decision_type}: {rec.explanation}" for rec in recommendations]
-    )
-    return ExecutiveBrief(
-        summary=summary,
-        markdown=markdown,
-        metrics={"total_projects": total_projects, "high_risk": high_risk},
-        recommendations=[
-            RecommendationRead(
-                decision_type=rec.decision_type,
-                affected_project_ids=rec.affected_project_ids,
-                expected_impact=rec.expected_impact,
-                explanation=rec.explanation,
-                confidence=rec.confidence,
-            )
-            for rec in recommendations
-        ],
-    )
+def executive_brief(
+    request: Request, response: Response, db: Session = Depends(get_db), user=Depends(auth_guard)
+):
+    brief = brief_store.get(db)
+    headers = {"ETag": brief.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if any(tag.strip() in (brief.etag, "*") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return brief.payload
+
+
+@router.get("/reports/executive-brief/metrics")
+def executive_brief_metrics(user=Depends(auth_guard)) -> dict:
+    return brief_store.stats()
 
 
 @router.post("/decisions/{decision_id}/feedback")
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Iterable, Mapping
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def read_columns(model, schema: type[BaseModel]) -> list:
+    """The columns of ``model`` backing each field of ``schema``, in field order."""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def json_rows(
+    rows: Iterable[tuple], schema: type[BaseModel], headers: Mapping[str, str] | None = None
+) -> Response:
+    """Serialize rows selected with ``read_columns`` to a JSON array of ``schema`` objects.
+
+    This skips building ORM instances and validating each one into ``schema``; the route keeps
+    ``response_model`` for its OpenAPI schema, which FastAPI does not apply to a ``Response``.
+    """
+    fields = tuple(schema.model_fields)
+    body = orjson.dumps([dict(zip(fields, row)) for row in rows])
+    return Response(content=body, media_type="application/json", headers=headers)
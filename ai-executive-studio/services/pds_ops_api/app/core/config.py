@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+
+from pydantic import BaseModel
+
+
+class Settings(BaseModel):
+    scenario_workers: int = int(os.getenv("SCENARIO_WORKERS", str(os.cpu_count() or 1)))
+    # Draws (iterations x risks) per shard. Shard boundaries and their seeds depend only on this
+    # value, never on the worker count, so changing it changes seeded results.
+    scenario_shard_size: int = int(os.getenv("SCENARIO_SHARD_SIZE", "20000000"))
+    scenario_cache_size: int = int(os.getenv("SCENARIO_CACHE_SIZE", "4096"))
+    scenario_cache_ttl_seconds: float = float(os.getenv("SCENARIO_CACHE_TTL_SECONDS", "3600"))
+    brief_debounce_seconds: float = float(os.getenv("BRIEF_DEBOUNCE_SECONDS", "2"))
+    # Serve the I/O-bound read endpoints from async handlers on an async engine.
+    database_async: bool = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+    # How long a client's replica reads go to the primary after it writes; cover replica lag.
+    database_read_sticky_seconds: float = float(os.getenv("DATABASE_READ_STICKY_SECONDS", "5"))
+    # "memory" (per-process LRU), "redis" (shared across workers) or "off".
+    response_cache_backend: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+    response_cache_ttl_seconds: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+    response_cache_redis_url: str = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
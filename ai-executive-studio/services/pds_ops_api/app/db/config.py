@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class DatabaseConfig:
+    url: str = "sqlite:///./pds_ops.db"
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    # Seconds before a pooled connection is replaced; keeps clear of server-side idle timeouts.
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    sqlite_wal: bool = True
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls, url: str | None = None) -> DatabaseConfig:
+        return cls(
+            url=url or os.getenv("DATABASE_URL", cls.url),
+            pool_size=int(os.getenv("DATABASE_POOL_SIZE", str(cls.pool_size))),
+            max_overflow=int(os.getenv("DATABASE_MAX_OVERFLOW", str(cls.max_overflow))),
+            pool_timeout=float(os.getenv("DATABASE_POOL_TIMEOUT", str(cls.pool_timeout))),
+            pool_recycle=int(os.getenv("DATABASE_POOL_RECYCLE", str(cls.pool_recycle))),
+            pool_pre_ping=_env_bool("DATABASE_POOL_PRE_PING", cls.pool_pre_ping),
+            sqlite_wal=_env_bool("SQLITE_WAL", cls.sqlite_wal),
+            sqlite_busy_timeout_ms=int(
+                os.getenv("SQLITE_BUSY_TIMEOUT_MS", str(cls.sqlite_busy_timeout_ms))
+            ),
+            sqlite_cache_size_kib=int(
+                os.getenv("SQLITE_CACHE_SIZE_KIB", str(cls.sqlite_cache_size_kib))
+            ),
+            sqlite_mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", str(cls.sqlite_mmap_size))),
+        )
+
+    @property
+    def is_sqlite(self) -> bool:
+        return make_url(self.url).get_backend_name() == "sqlite"
+
+    @property
+    def is_memory(self) -> bool:
+        return self.is_sqlite and make_url(self.url).database in (None, "", ":memory:")
+
+
+class PoolMetrics:
+    """Time each checkout waited for a connection, including opening a new one."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._recent: deque[float] = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            self._recent.append(seconds)
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            recent = sorted(self._recent) or [0.0]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_p50": recent[(len(recent) - 1) // 2],
+                "wait_seconds_p95": recent[int((len(recent) - 1) * 0.95)],
+            }
+
+
+class _TimedCheckout:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # dispose() swaps in a fresh pool; keep counting into the same metrics.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_kwargs(config: DatabaseConfig, poolclass) -> dict:
+    kwargs: dict = {"pool_pre_ping": config.pool_pre_ping}
+    if config.is_sqlite:
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not config.is_memory:
+        # In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+        kwargs.update(
+            poolclass=poolclass,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_recycle=config.pool_recycle,
+        )
+    return kwargs
+
+
+def _configure(sync_engine: Engine, config: DatabaseConfig) -> None:
+    if isinstance(sync_engine.pool, _TimedCheckout):
+        sync_engine.pool.metrics = PoolMetrics()
+    if not config.is_sqlite:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {config.sqlite_busy_timeout_ms}")
+        if config.sqlite_wal and not config.is_memory:
+            # Readers keep reading the last committed state while an import is writing.
+            cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA cache_size = -{config.sqlite_cache_size_kib}")
+        cursor.execute(f"PRAGMA mmap_size = {config.sqlite_mmap_size}")
+        cursor.close()
+
+
+def create_database_engine(config: DatabaseConfig) -> Engine:
+    engine = create_engine(config.url, future=True, **_engine_kwargs(config, TimedQueuePool))
+    _configure(engine, config)
+    return engine
+
+
+def create_async_database_engine(config: DatabaseConfig) -> AsyncEngine:
+    engine = create_async_engine(config.url, **_engine_kwargs(config, TimedAsyncQueuePool))
+    _configure(engine.sync_engine, config)
+    return engine
+
+
+def pool_stats(engine: Engine | AsyncEngine) -> dict:
+    """Pool occupancy and checkout wait metrics for ``engine``."""
+    pool = engine.pool
+    stats: dict = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    if isinstance(pool, _TimedCheckout):
+        stats.update(pool.metrics.stats())
+    return stats
@@ -1,18 +1,85 @@
 from __future__ import annotations
 
 import os
-from sqlalchemy import create_engine
+from dataclasses import replace
+from functools import lru_cache
+from typing import Iterator, Sequence
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./pds_ops.db")
+from app.db.config import (
+    DatabaseConfig,
+    create_async_database_engine,
+    create_database_engine,
+    pool_stats,
+)
 
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+database_config = DatabaseConfig.from_env()
+DATABASE_URL = database_config.url
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args, future=True)
+engine = create_database_engine(database_config)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 
+# Optional read replica for the heavy analytics reads; without one they share the primary.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+read_engine = (
+    create_database_engine(DatabaseConfig.from_env(url=DATABASE_READ_URL))
+    if DATABASE_READ_URL
+    else engine
+)
+ReadSessionLocal = (
+    sessionmaker(bind=read_engine, autocommit=False, autoflush=False, future=True)
+    if read_engine is not engine
+    else SessionLocal
+)
+
+# Async drivers used when DATABASE_ASYNC is enabled and ASYNC_DATABASE_URL is not set.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mssql": "mssql+aioodbc",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Sessions on the async engine, created on first use so the driver stays optional."""
+    url = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+    try:
+        async_engine = create_async_database_engine(replace(database_config, url=url))
+    except ImportError as exc:
+        raise RuntimeError(
+            "DATABASE_ASYNC requires an async driver (pip install -e .[async])"
+        ) from exc
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def database_pool_stats() -> dict:
+    stats = {"primary": pool_stats(engine)}
+    if read_engine is not engine:
+        stats["replica"] = pool_stats(read_engine)
+    if get_async_sessionmaker.cache_info().currsize:
+        stats["async"] = pool_stats(get_async_sessionmaker().kw["bind"])
+    return stats
+
 
 class Base(DeclarativeBase):
     pass
+
+
+# Values bound per ``IN (...)`` list; SQL Server rejects statements with over 2100 parameters.
+MAX_IN_PARAMETERS = 1000
+
+
+def in_batches(values: Sequence, size: int | None = None) -> Iterator[Sequence]:
+    size = size or MAX_IN_PARAMETERS
+    return (values[start : start + size] for start in range(0, len(values), size))
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models.models import DataVersion
+
+logger = logging.getLogger(__name__)
+
+_CHANGES_KEY = "pending_changes"
+
+
+@dataclass
+class ChangeSet:
+    tables: dict[str, set[int]] = field(default_factory=dict)
+    projects: set[int] = field(default_factory=set)
+    # Engine or connection the committing session was bound to, for listeners that write back.
+    bind: Any = None
+    # The ``data_versions`` counters of ``tables`` as set by this commit.
+    versions: dict[str, int] = field(default_factory=dict)
+
+    def add(self, table: str, ids: Iterable[int]) -> None:
+        self.tables.setdefault(table, set()).update(ids)
+
+
+ChangeListener = Callable[[ChangeSet], None]
+_listeners: list[ChangeListener] = []
+
+
+def on_commit(listener: ChangeListener) -> ChangeListener:
+    _listeners.append(listener)
+    return listener
+
+
+def _pending(session: Session) -> ChangeSet:
+    return session.info.setdefault(_CHANGES_KEY, ChangeSet())
+
+
+def mark_changed(
+    session: Session, table: str, ids: Iterable[int], projects: Iterable[int] = ()
+) -> None:
+    """Record writes made outside the ORM unit of work (bulk Core statements)."""
+    changes = _pending(session)
+    changes.add(table, ids)
+    changes.projects.update(projects)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    changes = _pending(session)
+    for instance in chain(session.new, session.dirty, session.deleted):
+        table = getattr(instance, "__tablename__", None)
+        if table is None or instance.id is None:
+            continue
+        changes.add(table, [instance.id])
+        if table == "projects":
+            changes.projects.add(instance.id)
+        elif table == "risks":
+            history = inspect(instance).attrs.project_id.history
+            project_ids = chain(history.sum(), [instance.project_id])
+            changes.projects.update(project_id for project_id in project_ids if project_id)
+
+
+def read_versions(session: Session, tables: Iterable[str]) -> dict[str, int]:
+    """Current ``data_versions`` counters of ``tables``; tables never written read as 0."""
+    names = list(tables)
+    rows = session.execute(
+        select(DataVersion.table_name, DataVersion.version).where(DataVersion.table_name.in_(names))
+    )
+    return {**dict.fromkeys(names, 0), **dict(rows.all())}
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session) -> None:
+    # Bumped inside the committing transaction, so other processes see the new data and the new
+    # versions together and can tell their in-memory state is stale.
+    session.flush()
+    changes = session.info.get(_CHANGES_KEY)
+    if not changes or not changes.tables:
+        return
+    versions = DataVersion.__table__
+    for name in sorted(changes.tables):
+        bumped = session.execute(
+            update(versions)
+            .where(versions.c.table_name == name)
+            .values(version=versions.c.version + 1)
+        )
+        if not bumped.rowcount:
+            session.execute(insert(versions).values(table_name=name, version=1))
+    changes.versions = read_versions(session, changes.tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session) -> None:
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes or not changes.tables:
+        return
+    changes.bind = session.get_bind()
+    for listener in _listeners:
+        try:
+            listener(changes)
+        except Exception:
+            logger.exception("Change listener %r failed", listener)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_CHANGES_KEY, None)
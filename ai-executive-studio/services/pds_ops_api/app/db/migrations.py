@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.database import Base
+from app.models import models  # noqa: F401  (registers the tables on Base.metadata)
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, description: str):
+    def register(upgrade: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} must follow {MIGRATIONS[-1].version}")
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        return upgrade
+
+    return register
+
+
+def _add_column(conn: Connection, table: str, name: str, type_) -> None:
+    if name in {column["name"] for column in inspect(conn).get_columns(table)}:
+        return
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {type_.compile(conn.dialect)}"))
+
+
+def _create_index(
+    conn: Connection, table: str, column: str, unique: bool = False, where: str | None = None
+) -> None:
+    # A detached table keeps the index out of the model metadata; the name matches index=True.
+    target = Table(table, MetaData(), Column(column))
+    filtered = {f"{dialect}_where": text(where) for dialect in ("sqlite", "mssql")} if where else {}
+    index = Index(f"ix_{table}_{column}", target.c[column], unique=unique, **filtered)
+    index.create(conn, checkfirst=True)
+
+
+@migration(1, "projects.external_id and content_hash for upsert imports")
+def _project_import_keys(conn: Connection) -> None:
+    _add_column(conn, "projects", "external_id", String())
+    _add_column(conn, "projects", "content_hash", String())
+    _create_index(conn, "projects", "external_id", unique=True, where="external_id IS NOT NULL")
+
+
+@migration(2, "indexes for list filters, sorting and foreign key lookups")
+def _access_path_indexes(conn: Connection) -> None:
+    for table, column in (
+        ("clients", "name"),
+        ("projects", "client_id"),
+        ("projects", "region"),
+        ("projects", "sector"),
+        ("projects", "start_date"),
+        ("projects", "end_date"),
+        ("projects", "status"),
+        ("resources", "name"),
+        ("resources", "role"),
+        ("resources", "region"),
+        ("risks", "project_id"),
+        ("risks", "category"),
+        ("risks", "mitigation_status"),
+        ("decisions", "decision_type"),
+        ("decisions", "status"),
+        ("outcomes", "decision_id"),
+        ("process_templates", "name"),
+        ("gap_inputs", "category"),
+    ):
+        _create_index(conn, table, column)
+
+
+def current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table(schema_version.name):
+        return 0
+    return conn.scalar(select(func.max(schema_version.c.version))) or 0
+
+
+def migrate(engine: Engine | Connection) -> list[int]:
+    """Bring the database schema up to date and return the versions applied.
+
+    Tables missing from the database are created from the models first. A database without any
+    tables is then stamped with the latest version, since ``create_all`` already built it in its
+    final shape; an existing database runs every migration newer than its recorded version, so
+    migrations must tolerate tables that ``create_all`` has just created.
+    """
+    if isinstance(engine, Connection):
+        return _migrate(engine)
+    with engine.begin() as conn:
+        return _migrate(conn)
+
+
+def _migrate(conn: Connection) -> list[int]:
+    fresh = not inspect(conn).has_table("projects")
+    schema_version.create(conn, checkfirst=True)
+    current = current_version(conn)
+    Base.metadata.create_all(conn)
+    pending = [item for item in MIGRATIONS if item.version > current]
+    for item in pending:
+        if not fresh:
+            logger.info("Applying migration %s: %s", item.version, item.description)
+            item.upgrade(conn)
+        conn.execute(
+            insert(schema_version).values(
+                version=item.version, description=item.description, applied_at=datetime.utcnow()
+            )
+        )
+    return [item.version for item in pending]
@@ -2,11 +2,27 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date
-from typing import Iterable
-import random
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Iterable, Mapping, Sequence
+import math
 
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.engine.correlation import CorrelationModel, GaussianCopula, build_copula
+from app.engine.quantiles import DEFAULT_BINS, QuantileHistogram
+from app.engine.sampling import Sampler, make_sampler
+from app.engine.snapshot import PortfolioSnapshot
 from app.models.models import Project, RiskItem
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Upper bound on the number of uniform draws (iterations x risks) held in memory at once.
+SIMULATION_CHUNK_ELEMENTS = 2_000_000
+DEFAULT_PERCENTILES = (50.0, 80.0)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
 
 @dataclass
 class KPI:
@@ -27,27 +43,21 @@ def _safe_div(numerator: float, denominator: float) -> float:
 
 
 def calculate_kpi(project: Project, as_of: date | None = None) -> KPI:
-    percent_complete = project.percent_complete / 100 if project.percent_complete > 1 else project.percent_complete
-    ev = percent_complete * project.baseline_budget
-    ac = project.actual_spend
-    if not as_of:
-        as_of = date.today()
-    time_elapsed = (as_of - project.start_date).days
-    baseline_duration = project.baseline_schedule_days or max((project.end_date - project.start_date).days, 1)
-    pv = _safe_div(time_elapsed, baseline_duration) * project.baseline_budget
-    cv = ev - ac
-    sv = ev - pv
-    cpi = _safe_div(ev, ac)
-    spi = _safe_div(ev, pv)
+    kpis = calculate_kpis(
+        {
+            "project_id": [project.id],
+            "percent_complete": [project.percent_complete],
+            "baseline_budget": [project.baseline_budget],
+            "actual_spend": [project.actual_spend],
+            "start_date": [project.start_date],
+            "end_date": [project.end_date],
+            "baseline_schedule_days": [project.baseline_schedule_days or 0],
+        },
+        as_of,
+    )
     return KPI(
         project_id=project.id,
-        ev=ev,
-        ac=ac,
-        pv=pv,
-        cv=cv,
-        sv=sv,
-        cpi=cpi,
-        spi=spi,
+        **{name: float(values[0]) for name, values in kpis.items() if name != "project_id"},
     )
 
 
@@ -70,37 +80,341 @@ def portfolio_totals(kpis: Iterable[KPI]) -> dict[str, float]:
     return totals
 
 
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(
+        numerator, denominator, out=np.zeros(len(numerator)), where=denominator != 0
+    )
+
+
+def _ordinals(values: ArrayLike) -> np.ndarray:
+    array = np.asarray(values)
+    if array.dtype.kind in "iu":
+        return array.astype(np.int64, copy=False)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+    return np.fromiter((day.toordinal() for day in array), dtype=np.int64, count=len(array))
+
+
+def calculate_kpis(
+    columns: Mapping[str, ArrayLike] | pd.DataFrame, as_of: date | None = None
+) -> dict[str, np.ndarray]:
+    """Batch ``calculate_kpi`` over column arrays (or a DataFrame with the same columns).
+
+    Needs ``project_id``, ``percent_complete``, ``baseline_budget``, ``actual_spend``,
+    ``start_date``, ``end_date`` and ``baseline_schedule_days``. Dates may be ``date`` objects,
+    ``datetime64`` values or proleptic ordinals.
+    """
+    if not as_of:
+        as_of = date.today()
+    percent = np.asarray(columns["percent_complete"], dtype=np.float64)
+    budget = np.asarray(columns["baseline_budget"], dtype=np.float64)
+    ac = np.asarray(columns["actual_spend"], dtype=np.float64)
+    start = _ordinals(columns["start_date"])
+    end = _ordinals(columns["end_date"])
+    schedule_days = np.asarray(columns["baseline_schedule_days"], dtype=np.int64)
+
+    percent_complete = np.where(percent > 1, percent / 100, percent)
+    ev = percent_complete * budget
+    time_elapsed = as_of.toordinal() - start
+    baseline_duration = np.where(schedule_days != 0, schedule_days, np.maximum(end - start, 1))
+    pv = _safe_divide(time_elapsed, baseline_duration) * budget
+    return {
+        "project_id": np.asarray(columns["project_id"]),
+        "ev": ev,
+        "ac": ac,
+        "pv": pv,
+        "cv": ev - ac,
+        "sv": ev - pv,
+        "cpi": _safe_divide(ev, ac),
+        "spi": _safe_divide(ev, pv),
+    }
+
+
+def snapshot_kpis(snapshot: PortfolioSnapshot, as_of: date | None = None) -> dict[str, np.ndarray]:
+    return calculate_kpis(
+        {
+            "project_id": snapshot.project_ids,
+            "percent_complete": snapshot.percent_complete,
+            "baseline_budget": snapshot.baseline_budget,
+            "actual_spend": snapshot.actual_spend,
+            "start_date": snapshot.start_ordinals,
+            "end_date": snapshot.end_ordinals,
+            "baseline_schedule_days": snapshot.baseline_schedule_days,
+        },
+        as_of,
+    )
+
+
+def snapshot_totals(kpis: dict[str, np.ndarray]) -> dict[str, float]:
+    totals = {name: float(kpis[name].sum()) for name in ("ev", "ac", "pv", "cv", "sv")}
+    totals["cpi"] = _safe_div(totals["ev"], totals["ac"])
+    totals["spi"] = _safe_div(totals["ev"], totals["pv"])
+    return totals
+
+
+def attention_scores(snapshot: PortfolioSnapshot, kpis: dict[str, np.ndarray]) -> np.ndarray:
+    return (
+        np.abs(kpis["cv"]) * 0.2
+        + np.abs(kpis["sv"]) * 0.15
+        + snapshot.risk_exposure * 0.1
+        + snapshot.client_priority * 10
+        + np.maximum(0.0, 5 - snapshot.client_satisfaction) * 5
+        + snapshot.client_pipeline * 0.0001
+        + snapshot.safety_incidents * 15
+    )
+
+
+def rank_snapshot(snapshot: PortfolioSnapshot, as_of: date | None = None) -> list[dict[str, float]]:
+    kpis = snapshot_kpis(snapshot, as_of)
+    scores = attention_scores(snapshot, kpis)
+    order = np.argsort(-scores, kind="stable")
+    columns = zip(
+        snapshot.project_ids[order].tolist(),
+        scores[order].tolist(),
+        kpis["cv"][order].tolist(),
+        kpis["sv"][order].tolist(),
+        snapshot.risk_exposure[order].tolist(),
+    )
+    return [
+        {
+            "project_id": project_id,
+            "attention_score": score,
+            "cv": cv,
+            "sv": sv,
+            "risk_exposure": exposure,
+        }
+        for project_id, score, cv, sv, exposure in columns
+    ]
+
+
 def portfolio_ranking(projects: list[Project], risks: list[RiskItem]) -> list[dict[str, float]]:
-    risk_map: dict[int, float] = {}
-    for risk in risks:
-        risk_map.setdefault(risk.project_id, 0.0)
-        risk_map[risk.project_id] += risk.probability * (risk.impact_cost + risk.impact_days * 1000)
-
-    ranking = []
-    for project in projects:
-        kpi = calculate_kpi(project)
-        client_priority = project.client.strategic_priority if project.client else 1
-        satisfaction = project.client.satisfaction_score if project.client else 0
-        pipeline = project.client.pipeline_value if project.client else 0
-        attention_score = (
-            abs(kpi.cv) * 0.2
-            + abs(kpi.sv) * 0.15
-            + risk_map.get(project.id, 0.0) * 0.1
-            + client_priority * 10
-            + max(0.0, (5 - satisfaction)) * 5
-            + pipeline * 0.0001
-            + project.safety_incidents * 15
+    return rank_snapshot(PortfolioSnapshot.from_objects(projects, risks))
+
+
+def _percentile_index(fraction: float, iterations: int) -> int:
+    return max(int(fraction * iterations) - 1, 0)
+
+
+def _percentiles(values: np.ndarray, fractions: tuple[float, ...]) -> list[np.ndarray]:
+    indices = [_percentile_index(fraction, values.shape[0]) for fraction in fractions]
+    partitioned = np.partition(values, sorted(set(indices)), axis=0)
+    return [partitioned[index] for index in indices]
+
+
+def _percentile_key(percentile: float, name: str) -> str:
+    return f"p{percentile:g}_{name}"
+
+
+def requested_percentiles(percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> tuple[float, ...]:
+    if any(not 0 < percentile <= 100 for percentile in percentiles):
+        raise ValueError("percentiles must be in (0, 100]")
+    return tuple(sorted(set(percentiles) | set(DEFAULT_PERCENTILES)))
+
+
+def _risk_impacts(
+    risks: list[RiskItem],
+    inflation_factor: float,
+    staffing_capacity_factor: float,
+    risk_mitigation_effectiveness: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    probabilities = np.fromiter(
+        (risk.probability for risk in risks), dtype=np.float64, count=len(risks)
+    )
+    probabilities = np.clip(probabilities * risk_mitigation_effectiveness, 0.0, 1.0)
+    impacts = np.empty((len(risks), 2), dtype=np.float64)
+    impacts[:, 0] = [risk.impact_cost * inflation_factor for risk in risks]
+    impacts[:, 1] = [risk.impact_days / max(staffing_capacity_factor, 0.1) for risk in risks]
+    return probabilities, impacts
+
+
+def _risk_sampler(
+    probabilities: np.ndarray,
+    rng: np.random.Generator,
+    sampler: str,
+    copula: GaussianCopula | None,
+) -> tuple[Sampler, np.ndarray]:
+    if copula is None:
+        return make_sampler(sampler, rng, len(probabilities)), probabilities
+    if sampler != "random":
+        raise ValueError("correlated risks only support the random sampler")
+    # Correlated latents are compared against normal quantiles instead of uniforms against p.
+    return (lambda rows: copula.latents(rng, rows)), copula.thresholds
+
+
+def _apply_risks(
+    outcomes: np.ndarray, probabilities: np.ndarray, impacts: np.ndarray, draw: Sampler
+) -> None:
+    chunk = max(SIMULATION_CHUNK_ELEMENTS // len(probabilities), 1)
+    for start in range(0, len(outcomes), chunk):
+        stop = min(start + chunk, len(outcomes))
+        hits = draw(stop - start) <= probabilities
+        outcomes[start:stop] += hits.astype(np.float64) @ impacts
+
+
+def simulate_project(
+    base: np.ndarray,
+    probabilities: np.ndarray,
+    impacts: np.ndarray,
+    iterations: int,
+    rng: np.random.Generator,
+    sampler: str = "random",
+    copula: GaussianCopula | None = None,
+) -> np.ndarray:
+    outcomes = np.empty((iterations, 2), dtype=np.float64)
+    outcomes[:] = base
+    if len(probabilities):
+        draw, limits = _risk_sampler(probabilities, rng, sampler, copula)
+        _apply_risks(outcomes, limits, impacts, draw)
+    return outcomes
+
+
+def _quantile_intervals(
+    outcomes: np.ndarray, fractions: tuple[float, ...], confidence: float
+) -> dict[str, tuple[float, float]]:
+    # Distribution-free bounds: the rank of the q-quantile among n draws is Binomial(n, q).
+    iterations = outcomes.shape[0]
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    ranks = {}
+    for fraction in fractions:
+        half_width = z * math.sqrt(iterations * fraction * (1 - fraction))
+        index = _percentile_index(fraction, iterations)
+        ranks[fraction] = (
+            max(math.floor(index - half_width), 0),
+            min(math.ceil(index + half_width), iterations - 1),
         )
-        ranking.append(
-            {
-                "project_id": project.id,
-                "attention_score": attention_score,
-                "cv": kpi.cv,
-                "sv": kpi.sv,
-                "risk_exposure": risk_map.get(project.id, 0.0),
-            }
+    kth = sorted({rank for bounds in ranks.values() for rank in bounds})
+    partitioned = np.partition(outcomes, kth, axis=0)
+    intervals = {}
+    for fraction, (low, high) in ranks.items():
+        for column, name in enumerate(("cost", "days")):
+            key = f"p{round(fraction * 100)}_{name}"
+            intervals[key] = (float(partitioned[low, column]), float(partitioned[high, column]))
+    return intervals
+
+
+def _simulate_until_converged(
+    base: np.ndarray,
+    probabilities: np.ndarray,
+    impacts: np.ndarray,
+    batch_size: int,
+    max_iterations: int,
+    tolerance: float,
+    confidence: float,
+    rng: np.random.Generator,
+    sampler: str,
+    copula: GaussianCopula | None,
+) -> tuple[np.ndarray, dict]:
+    draw = limits = None
+    if len(probabilities):
+        draw, limits = _risk_sampler(probabilities, rng, sampler, copula)
+    outcomes = np.empty((min(batch_size, max_iterations), 2), dtype=np.float64)
+    used = 0
+    while True:
+        # Growing batches by a quarter of the draws so far keeps the repeated interval checks
+        # O(n log n) overall while overshooting the stopping point by at most 25%.
+        size = min(max(batch_size, used // 4), max_iterations - used)
+        if used + size > len(outcomes):
+            grown = np.empty((min(max(2 * len(outcomes), used + size), max_iterations), 2))
+            grown[:used] = outcomes[:used]
+            outcomes = grown
+        batch = outcomes[used : used + size]
+        batch[:] = base
+        if draw is not None:
+            _apply_risks(batch, limits, impacts, draw)
+        used += size
+        intervals = _quantile_intervals(outcomes[:used], (0.5, 0.8), confidence)
+        estimates = summarize_project(outcomes[:used])
+        # A percentile of zero (no base, sparse risks) would demand a zero-width interval, so the
+        # tolerance is taken relative to the mean outcome when that is larger.
+        magnitudes = dict(zip(("cost", "days"), np.abs(outcomes[:used]).mean(axis=0)))
+        converged = all(
+            high - low <= tolerance * max(abs(estimates[key]), magnitudes[key.split("_")[1]])
+            for key, (low, high) in intervals.items()
         )
-    return sorted(ranking, key=lambda item: item["attention_score"], reverse=True)
+        if converged or used >= max_iterations:
+            break
+    return outcomes[:used], {"converged": converged, "tolerance": tolerance, "intervals": intervals}
+
+
+def pack_project(
+    project: Project,
+    risks: list[RiskItem],
+    inflation_factor: float = 1.0,
+    staffing_capacity_factor: float = 1.0,
+    risk_mitigation_effectiveness: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    probabilities, impacts = _risk_impacts(
+        risks, inflation_factor, staffing_capacity_factor, risk_mitigation_effectiveness
+    )
+    base = np.array([project.current_forecast, project.forecast_schedule_days], dtype=np.float64)
+    return base, probabilities, impacts
+
+
+def project_copula(
+    project: Project,
+    risks: list[RiskItem],
+    probabilities: np.ndarray,
+    correlation: CorrelationModel | None,
+) -> GaussianCopula | None:
+    categories = [risk.category for risk in risks]
+    return build_copula(correlation, probabilities, categories, [project.region] * len(risks))
+
+
+def summarize_project(
+    outcomes: np.ndarray, percentiles: Sequence[float] = DEFAULT_PERCENTILES
+) -> dict[str, float]:
+    values = _percentiles(outcomes, tuple(percentile / 100 for percentile in percentiles))
+    summary = {}
+    for percentile, value in zip(percentiles, values):
+        summary[_percentile_key(percentile, "cost")] = float(value[0])
+        summary[_percentile_key(percentile, "days")] = float(value[1])
+    return summary
+
+
+def outcome_histograms(
+    base: np.ndarray, impacts: np.ndarray, bins: int = DEFAULT_BINS
+) -> list[QuantileHistogram]:
+    # Every outcome lies between the base plus all negative impacts and the base plus all
+    # positive ones, so histograms over that range never need rebinning and always merge.
+    low = base + np.minimum(impacts, 0.0).sum(axis=0)
+    high = base + np.maximum(impacts, 0.0).sum(axis=0)
+    return [QuantileHistogram(float(low[column]), float(high[column]), bins) for column in range(2)]
+
+
+def stream_project(
+    base: np.ndarray,
+    probabilities: np.ndarray,
+    impacts: np.ndarray,
+    iterations: int,
+    rng: np.random.Generator,
+    sampler: str = "random",
+    bins: int = DEFAULT_BINS,
+    copula: GaussianCopula | None = None,
+) -> list[QuantileHistogram]:
+    histograms = outcome_histograms(base, impacts, bins)
+    draw = limits = None
+    if len(probabilities):
+        draw, limits = _risk_sampler(probabilities, rng, sampler, copula)
+    chunk = max(SIMULATION_CHUNK_ELEMENTS // max(len(probabilities), 1), 1)
+    for start in range(0, iterations, chunk):
+        block = np.empty((min(chunk, iterations - start), 2), dtype=np.float64)
+        block[:] = base
+        if draw is not None:
+            _apply_risks(block, limits, impacts, draw)
+        for column, histogram in enumerate(histograms):
+            histogram.update(block[:, column])
+    return histograms
+
+
+def summarize_histograms(
+    histograms: list[QuantileHistogram], percentiles: Sequence[float] = DEFAULT_PERCENTILES
+) -> dict:
+    summary: dict = {"error_bounds": {}}
+    for percentile in percentiles:
+        for histogram, name in zip(histograms, ("cost", "days")):
+            key = _percentile_key(percentile, name)
+            summary[key], summary["error_bounds"][key] = histogram.quantile(percentile / 100)
+    return summary
 
 
 def monte_carlo(
@@ -111,30 +425,290 @@ def monte_carlo(
     staffing_capacity_factor: float = 1.0,
     risk_mitigation_effectiveness: float = 1.0,
     seed: int | None = None,
-) -> dict[str, float]:
-    if seed is not None:
-        random.seed(seed)
-
-    total_costs = []
-    total_days = []
-    for _ in range(iterations):
-        cost = project.current_forecast
-        days = project.forecast_schedule_days
-        for risk in risks:
-            probability = min(max(risk.probability * risk_mitigation_effectiveness, 0.0), 1.0)
-            if random.random() <= probability:
-                cost += risk.impact_cost * inflation_factor
-                days += risk.impact_days / max(staffing_capacity_factor, 0.1)
-        total_costs.append(cost)
-        total_days.append(days)
-
-    total_costs.sort()
-    total_days.sort()
-    p50_index = int(0.5 * iterations) - 1
-    p80_index = int(0.8 * iterations) - 1
+    sampler: str = "random",
+    tolerance: float | None = None,
+    max_iterations: int = 1_000_000,
+    confidence: float = 0.95,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    streaming: bool = False,
+    bins: int = DEFAULT_BINS,
+    correlation: CorrelationModel | None = None,
+) -> dict:
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+    if streaming and tolerance is not None:
+        raise ValueError("streaming percentiles cannot be combined with a tolerance")
+    if tolerance is not None and tolerance <= 0:
+        raise ValueError("tolerance must be greater than 0")
+    percentiles = requested_percentiles(percentiles)
+    rng = np.random.default_rng(seed)
+    base, probabilities, impacts = pack_project(
+        project, risks, inflation_factor, staffing_capacity_factor, risk_mitigation_effectiveness
+    )
+    copula = project_copula(project, risks, probabilities, correlation)
+    if streaming:
+        histograms = stream_project(
+            base, probabilities, impacts, iterations, rng, sampler, bins, copula
+        )
+        return summarize_histograms(histograms, percentiles)
+    if tolerance is None:
+        outcomes = simulate_project(base, probabilities, impacts, iterations, rng, sampler, copula)
+        return summarize_project(outcomes, percentiles)
+    # Target-precision mode: `iterations` is the batch size, grown until the confidence
+    # intervals on P50/P80 are narrower than `tolerance` relative to the estimate (or to the
+    # mean outcome, if larger).
+    outcomes, convergence = _simulate_until_converged(
+        base,
+        probabilities,
+        impacts,
+        iterations,
+        max(max_iterations, iterations),
+        tolerance,
+        confidence,
+        rng,
+        sampler,
+        copula,
+    )
     return {
-        "p50_cost": total_costs[max(p50_index, 0)],
-        "p80_cost": total_costs[max(p80_index, 0)],
-        "p50_days": total_days[max(p50_index, 0)],
-        "p80_days": total_days[max(p80_index, 0)],
+        **summarize_project(outcomes, percentiles),
+        "iterations": len(outcomes),
+        "convergence": convergence,
     }
+
+
+def scenario_sweep(
+    project: Project,
+    risks: list[RiskItem],
+    inflation_factors: list[float],
+    staffing_capacity_factors: list[float],
+    risk_mitigation_effectiveness: list[float],
+    iterations: int = 1000,
+    seed: int | None = None,
+    sampler: str = "random",
+) -> dict[str, list[list[float]]]:
+    # Every grid point is evaluated against the same uniform draws (common random numbers).
+    # Cost depends only on (mitigation, inflation) and days only on (mitigation, staffing),
+    # so the grid is returned as two compact matrices instead of a full cube.
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+    base, probabilities, impacts = pack_project(project, risks)
+    mitigation = np.asarray(risk_mitigation_effectiveness, dtype=np.float64)
+    thresholds = np.clip(np.outer(mitigation, probabilities), 0.0, 1.0)
+    inflation = np.asarray(inflation_factors, dtype=np.float64)
+    staffing = 1 / np.maximum(np.asarray(staffing_capacity_factors, dtype=np.float64), 0.1)
+    # The draws are replayed from the same seed for each mitigation level, so only one level's
+    # totals are held at a time.
+    entropy = np.random.SeedSequence(seed)
+    result: dict[str, list[list[float]]] = {
+        "p50_cost": [],
+        "p80_cost": [],
+        "p50_days": [],
+        "p80_days": [],
+    }
+    for threshold in thresholds:
+        totals = np.zeros((iterations, 2), dtype=np.float64)
+        if len(probabilities):
+            draw = make_sampler(sampler, np.random.default_rng(entropy), len(probabilities))
+            chunk = max(SIMULATION_CHUNK_ELEMENTS // len(probabilities), 1)
+            for start in range(0, iterations, chunk):
+                stop = min(start + chunk, iterations)
+                hits = draw(stop - start) <= threshold
+                totals[start:stop] = hits.astype(np.float64) @ impacts
+        p50_cost, p80_cost = _scaled_percentiles(base[0], totals[:, 0], inflation)
+        p50_days, p80_days = _scaled_percentiles(base[1], totals[:, 1], staffing)
+        result["p50_cost"].append(p50_cost)
+        result["p80_cost"].append(p80_cost)
+        result["p50_days"].append(p50_days)
+        result["p80_days"].append(p80_days)
+    return result
+
+
+def _scaled_percentiles(
+    base: float, totals: np.ndarray, factors: np.ndarray
+) -> tuple[list[float], list[float]]:
+    # P50 and P80 of base + totals * factor for each factor, a few factors at a time.
+    columns = max(SIMULATION_CHUNK_ELEMENTS // len(totals), 1)
+    p50: list[float] = []
+    p80: list[float] = []
+    for start in range(0, len(factors), columns):
+        values = base + np.outer(totals, factors[start : start + columns])
+        low, high = _percentiles(values, (0.5, 0.8))
+        p50.extend(low.tolist())
+        p80.extend(high.tolist())
+    return p50, p80
+
+
+@dataclass
+class PortfolioArrays:
+    project_ids: np.ndarray
+    base: np.ndarray
+    risk_offsets: np.ndarray
+    probabilities: np.ndarray
+    impacts: np.ndarray
+    copula: GaussianCopula | None = None
+
+    def select(self, start: int, stop: int) -> PortfolioArrays:
+        first, last = int(self.risk_offsets[start]), int(self.risk_offsets[stop])
+        return PortfolioArrays(
+            project_ids=self.project_ids[start:stop],
+            base=self.base[start:stop],
+            risk_offsets=self.risk_offsets[start : stop + 1] - first,
+            probabilities=self.probabilities[first:last],
+            impacts=self.impacts[first:last],
+            copula=self.copula.select(first, last) if self.copula else None,
+        )
+
+
+def pack_portfolio(
+    projects: list[Project],
+    risks: list[RiskItem],
+    inflation_factor: float = 1.0,
+    staffing_capacity_factor: float = 1.0,
+    risk_mitigation_effectiveness: float = 1.0,
+    correlation: CorrelationModel | None = None,
+) -> PortfolioArrays:
+    by_project: dict[int, list[RiskItem]] = {project.id: [] for project in projects}
+    for risk in risks:
+        if risk.project_id in by_project:
+            by_project[risk.project_id].append(risk)
+    ordered = [risk for project in projects for risk in by_project[project.id]]
+    counts = [len(by_project[project.id]) for project in projects]
+    probabilities, impacts = _risk_impacts(
+        ordered, inflation_factor, staffing_capacity_factor, risk_mitigation_effectiveness
+    )
+    base = np.array(
+        [[project.current_forecast, project.forecast_schedule_days] for project in projects],
+        dtype=np.float64,
+    ).reshape(len(projects), 2)
+    regions = [project.region for project in projects for _ in by_project[project.id]]
+    return PortfolioArrays(
+        project_ids=np.array([project.id for project in projects], dtype=np.int64),
+        base=base,
+        risk_offsets=np.concatenate(([0], np.cumsum(counts, dtype=np.int64))),
+        probabilities=probabilities,
+        impacts=impacts,
+        copula=build_copula(
+            correlation, probabilities, [risk.category for risk in ordered], regions
+        ),
+    )
+
+
+def _project_blocks(risk_offsets: np.ndarray, iterations: int) -> Iterable[tuple[int, int]]:
+    max_elements = max(SIMULATION_CHUNK_ELEMENTS // iterations, 1)
+    total = len(risk_offsets) - 1
+    start = 0
+    while start < total:
+        stop = start + 1
+        while (
+            stop < total
+            and stop - start < max_elements
+            and risk_offsets[stop + 1] - risk_offsets[start] <= max_elements
+        ):
+            stop += 1
+        yield start, stop
+        start = stop
+
+
+def _simulate_block(
+    portfolio: PortfolioArrays,
+    start: int,
+    stop: int,
+    iterations: int,
+    rng: np.random.Generator,
+    scratch: tuple[np.ndarray, np.ndarray],
+    factors: np.ndarray | None,
+) -> np.ndarray:
+    outcomes = np.empty((iterations, stop - start, 2), dtype=np.float64)
+    outcomes[:] = portfolio.base[start:stop]
+    offsets = portfolio.risk_offsets[start : stop + 1]
+    first, last = int(offsets[0]), int(offsets[-1])
+    width = last - first
+    if not width:
+        return outcomes
+    # Empty projects occupy zero width, so reducing at the starts of non-empty
+    # projects yields exactly one segment sum per non-empty project.
+    non_empty = np.flatnonzero(np.diff(offsets))
+    segment_starts = offsets[non_empty] - first
+    probabilities = portfolio.probabilities[first:last]
+    impacts = portfolio.impacts[first:last]
+    copula = portfolio.copula.select(first, last) if portfolio.copula else None
+    chunk = max(min(SIMULATION_CHUNK_ELEMENTS // width, iterations), 1)
+    draws_buffer, weighted_buffer = scratch
+    for begin in range(0, iterations, chunk):
+        end = min(begin + chunk, iterations)
+        size = (end - begin) * width
+        if copula is None:
+            draws = rng.random(out=draws_buffer[:size].reshape(end - begin, width))
+            hits = draws <= probabilities
+        else:
+            hits = copula.latents(rng, end - begin, factors[begin:end]) <= copula.thresholds
+        weighted = weighted_buffer[:size].reshape(end - begin, width)
+        for column in range(2):
+            np.multiply(hits, impacts[:, column], out=weighted)
+            sums = np.add.reduceat(weighted, segment_starts, axis=1)
+            if len(non_empty) == stop - start:
+                outcomes[begin:end, :, column] += sums
+            else:
+                outcomes[begin:end, non_empty, column] += sums
+    return outcomes
+
+
+def simulate_portfolio(
+    portfolio: PortfolioArrays,
+    iterations: int,
+    rng: np.random.Generator,
+    factor_rng: np.random.Generator | None = None,
+) -> tuple[list[dict], np.ndarray]:
+    # Group factors are drawn once for all iterations so every project block (and every shard
+    # given the same factor_rng) sees the same correlated shocks in a given iteration.
+    factors = None
+    if portfolio.copula is not None:
+        factors = portfolio.copula.factors(factor_rng or rng, iterations)
+    results = []
+    portfolio_cost = np.zeros(iterations, dtype=np.float64)
+    scratch_size = min(SIMULATION_CHUNK_ELEMENTS, iterations * max(len(portfolio.probabilities), 1))
+    scratch = (np.empty(scratch_size), np.empty(scratch_size))
+    for start, stop in _project_blocks(portfolio.risk_offsets, iterations):
+        outcomes = _simulate_block(portfolio, start, stop, iterations, rng, scratch, factors)
+        portfolio_cost += outcomes[:, :, 0].sum(axis=1)
+        p50, p80 = _percentiles(outcomes, (0.5, 0.8))
+        for offset, project_id in enumerate(portfolio.project_ids[start:stop]):
+            results.append(
+                {
+                    "project_id": int(project_id),
+                    "p50_cost": float(p50[offset, 0]),
+                    "p80_cost": float(p80[offset, 0]),
+                    "p50_days": float(p50[offset, 1]),
+                    "p80_days": float(p80[offset, 1]),
+                }
+            )
+    return results, portfolio_cost
+
+
+def summarize_portfolio(results: list[dict], portfolio_cost: np.ndarray) -> dict:
+    p50_cost, p80_cost = _percentiles(portfolio_cost, (0.5, 0.8))
+    return {"projects": results, "p50_cost": float(p50_cost), "p80_cost": float(p80_cost)}
+
+
+def monte_carlo_portfolio(
+    projects: list[Project],
+    risks: list[RiskItem],
+    iterations: int = 1000,
+    inflation_factor: float = 1.0,
+    staffing_capacity_factor: float = 1.0,
+    risk_mitigation_effectiveness: float = 1.0,
+    seed: int | None = None,
+    correlation: CorrelationModel | None = None,
+) -> dict:
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+    portfolio = pack_portfolio(
+        projects,
+        risks,
+        inflation_factor,
+        staffing_capacity_factor,
+        risk_mitigation_effectiveness,
+        correlation,
+    )
+    results, portfolio_cost = simulate_portfolio(portfolio, iterations, np.random.default_rng(seed))
+    return summarize_portfolio(results, portfolio_cost)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.events import ChangeSet, on_commit, read_versions
+from app.engine.recommendations import recommend_from_snapshot
+from app.engine.snapshot import portfolio_snapshot
+from app.models.models import ProcessTemplate, RuleFeedback
+
+logger = logging.getLogger(__name__)
+
+# Tables the brief reads; commits touching any other table leave it fresh.
+BRIEF_TABLES = frozenset({"projects", "clients", "risks", "process_templates", "rule_feedback"})
+
+
+def build_brief(db: Session, as_of: date | None = None) -> dict:
+    snapshot = portfolio_snapshot.get(db)
+    templates = db.query(ProcessTemplate).all()
+    feedback = db.query(RuleFeedback).all()
+    recommendations = recommend_from_snapshot(snapshot, templates, feedback, as_of)
+    total_projects = len(snapshot)
+    high_risk = int(snapshot.high_risk_count.sum())
+    summary = f"Portfolio tracking {total_projects} projects with {high_risk} high-risk items."
+    markdown = f"# Executive Brief\n\n{summary}\n\n## Recommendations\n" + "\n".join(
+        [f"- {rec.decision_type}: {rec.explanation}" for rec in recommendations]
+    )
+    return {
+        "summary": summary,
+        "markdown": markdown,
+        "metrics": {"total_projects": total_projects, "high_risk": high_risk},
+        "recommendations": [
+            {
+                "decision_type": rec.decision_type,
+                "affected_project_ids": rec.affected_project_ids,
+                "expected_impact": rec.expected_impact,
+                "explanation": rec.explanation,
+                "confidence": rec.confidence,
+            }
+            for rec in recommendations
+        ],
+    }
+
+
+@dataclass(frozen=True)
+class MaterializedBrief:
+    payload: dict
+    etag: str
+    version: int
+    as_of: date
+    generated_at: float
+    # ``data_versions`` of ``BRIEF_TABLES`` read before the brief was built.
+    data_versions: dict[str, int] = field(default_factory=dict)
+
+
+class BriefStore:
+    """Keeps the last generated brief and regenerates it in the background after writes.
+
+    Commits touching ``BRIEF_TABLES`` start (or restart) a debounce timer, so a burst of writes
+    triggers one regeneration. Until it runs, requests get the previous brief and ``stats``
+    reports how long it has been stale. Writes from other processes schedule nothing here, so a
+    request that finds ``data_versions`` moved without a pending regeneration rebuilds the brief.
+    """
+
+    def __init__(
+        self,
+        debounce_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.debounce_seconds = (
+            get_settings().brief_debounce_seconds if debounce_seconds is None else debounce_seconds
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._generate_lock = threading.Lock()
+        self._brief: MaterializedBrief | None = None
+        self._stale_since: float | None = None
+        self._timer: threading.Timer | None = None
+        self.hits = 0
+        self.generations = 0
+        self.last_generation_seconds = 0.0
+        self.last_staleness_seconds = 0.0
+
+    def get(self, db: Session) -> MaterializedBrief:
+        with self._lock:
+            brief = self._brief
+        if brief is None or brief.as_of != date.today():
+            return self.regenerate(db)
+        with self._lock:
+            scheduled = self._stale_since is not None
+        if not scheduled and read_versions(db, BRIEF_TABLES) != brief.data_versions:
+            return self.regenerate(db)
+        with self._lock:
+            self.hits += 1
+        return brief
+
+    def regenerate(self, db: Session) -> MaterializedBrief:
+        with self._generate_lock:
+            with self._lock:
+                stale_since = self._stale_since
+            started = self._clock()
+            data_versions = read_versions(db, BRIEF_TABLES)
+            payload = build_brief(db)
+            finished = self._clock()
+            etag = '"' + hashlib.sha256(
+                json.dumps(payload, sort_keys=True, default=str).encode()
+            ).hexdigest()[:32] + '"'
+            with self._lock:
+                previous = self._brief
+                if previous is not None and previous.etag == etag:
+                    version = previous.version
+                else:
+                    version = previous.version + 1 if previous else 1
+                self._brief = MaterializedBrief(
+                    payload, etag, version, date.today(), time.time(), data_versions
+                )
+                # Changes committed while generating keep the brief marked stale.
+                if self._stale_since == stale_since:
+                    self._stale_since = None
+                if stale_since is not None:
+                    self.last_staleness_seconds = finished - stale_since
+                self.generations += 1
+                self.last_generation_seconds = finished - started
+                return self._brief
+
+    def invalidate(self, changes: ChangeSet) -> None:
+        if BRIEF_TABLES.isdisjoint(changes.tables) or changes.bind is None:
+            return
+        with self._lock:
+            if self._brief is None:
+                return
+            if self._stale_since is None:
+                self._stale_since = self._clock()
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(
+                self.debounce_seconds, self._regenerate_from, (changes.bind,)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _regenerate_from(self, bind) -> None:
+        try:
+            with Session(bind=bind) as db:
+                self.regenerate(db)
+        except Exception:
+            logger.exception("Background executive brief regeneration failed")
+
+    def wait(self) -> None:
+        """Block until a scheduled regeneration has finished."""
+        with self._lock:
+            timer = self._timer
+        if timer is not None:
+            timer.join()
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._brief, self._stale_since, self._timer = None, None, None
+
+    def stats(self) -> dict[str, float | int | str | None]:
+        with self._lock:
+            brief = self._brief
+            return {
+                "version": brief.version if brief else 0,
+                "etag": brief.etag if brief else None,
+                "generated_at": brief.generated_at if brief else None,
+                "generations": self.generations,
+                "hits": self.hits,
+                "last_generation_seconds": self.last_generation_seconds,
+                "stale": self._stale_since is not None,
+                "staleness_seconds": (
+                    self._clock() - self._stale_since if self._stale_since is not None else 0.0
+                ),
+                "last_staleness_seconds": self.last_staleness_seconds,
+            }
+
+
+brief_store = BriefStore()
+
+
+@on_commit
+def _refresh_brief(changes: ChangeSet) -> None:
+    brief_store.invalidate(changes)
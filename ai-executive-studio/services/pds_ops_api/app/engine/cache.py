@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+from app.core.config import get_settings
+from app.db.events import ChangeSet, on_commit
+from app.models.models import Project, RiskItem
+
+
+def _row_digest(hasher: Any, row: Any) -> None:
+    for column in row.__table__.columns:
+        hasher.update(repr(getattr(row, column.key)).encode())
+        hasher.update(b"\x1f")
+    hasher.update(b"\x1e")
+
+
+def data_version(project: Project, risks: Iterable[RiskItem]) -> str:
+    hasher = hashlib.sha256()
+    _row_digest(hasher, project)
+    for risk in sorted(risks, key=lambda item: item.id or 0):
+        _row_digest(hasher, risk)
+    return hasher.hexdigest()
+
+
+class ScenarioCache:
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        settings = get_settings()
+        self.max_entries = max_entries or settings.scenario_cache_size
+        self.ttl_seconds = (
+            settings.scenario_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, dict]] = OrderedDict()
+        self._keys_by_project: dict[int, set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(project: Project, risks: list[RiskItem], **params: Any) -> tuple:
+        return (project.id, data_version(project, risks), tuple(sorted(params.items())))
+
+    def get(self, key: tuple) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < self._clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: tuple, value: dict) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            self._keys_by_project.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_projects(self, project_ids: Iterable[int]) -> None:
+        with self._lock:
+            for project_id in project_ids:
+                for key in self._keys_by_project.pop(project_id, ()):
+                    if self._entries.pop(key, None) is not None:
+                        self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_project.clear()
+
+    def _remove(self, key: tuple) -> None:
+        del self._entries[key]
+        keys = self._keys_by_project.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_project[key[0]]
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+scenario_cache = ScenarioCache()
+
+
+@on_commit
+def _invalidate_scenarios(changes: ChangeSet) -> None:
+    scenario_cache.invalidate_projects(changes.projects)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, replace
+from statistics import NormalDist
+from typing import Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CorrelationModel:
+    """Latent correlation between two risks: `category` if they share a category plus `region`
+    if their projects share a region. Both must be non-negative and sum to at most 1."""
+
+    category: float = 0.0
+    region: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.category < 0 or self.region < 0 or self.category + self.region > 1:
+            raise ValueError("correlations must be non-negative and sum to at most 1")
+
+    @property
+    def independent(self) -> bool:
+        return self.category == 0 and self.region == 0
+
+
+def _cholesky(matrix: np.ndarray) -> np.ndarray:
+    # The group matrix is a sum of block indicators, so it is PSD but may be singular.
+    jitter = 0.0
+    while True:
+        try:
+            return np.linalg.cholesky(matrix + jitter * np.eye(len(matrix)))
+        except np.linalg.LinAlgError:
+            jitter = max(jitter * 10, 1e-12)
+
+
+@dataclass
+class GaussianCopula:
+    group_index: np.ndarray
+    cholesky: np.ndarray
+    shared: float
+    thresholds: np.ndarray
+
+    def select(self, first: int, last: int) -> GaussianCopula:
+        return replace(
+            self,
+            group_index=self.group_index[first:last],
+            thresholds=self.thresholds[first:last],
+        )
+
+    def factors(self, rng: np.random.Generator, rows: int) -> np.ndarray:
+        return rng.standard_normal((rows, len(self.cholesky))) @ self.cholesky.T
+
+    def latents(
+        self, rng: np.random.Generator, rows: int, factors: np.ndarray | None = None
+    ) -> np.ndarray:
+        if factors is None:
+            factors = self.factors(rng, rows)
+        latents = rng.standard_normal((rows, len(self.group_index)))
+        latents *= math.sqrt(1 - self.shared)
+        latents += math.sqrt(self.shared) * factors[:, self.group_index]
+        return latents
+
+
+def build_copula(
+    model: CorrelationModel | None,
+    probabilities: np.ndarray,
+    categories: Sequence[str],
+    regions: Sequence[str],
+) -> GaussianCopula | None:
+    if model is None or model.independent or not len(probabilities):
+        return None
+    keys = list(zip(categories, regions))
+    groups = sorted(set(keys))
+    lookup = {group: index for index, group in enumerate(groups)}
+    group_categories = np.array([category for category, _ in groups], dtype=object)
+    group_regions = np.array([region for _, region in groups], dtype=object)
+    shared = model.category + model.region
+    # Risk latents are sqrt(shared) * group factor + sqrt(1 - shared) * noise, so the group
+    # factors need correlation (category * same_category + region * same_region) / shared.
+    matrix = (
+        model.category * (group_categories[:, None] == group_categories[None, :])
+        + model.region * (group_regions[:, None] == group_regions[None, :])
+    ) / shared
+    inverse_cdf = NormalDist().inv_cdf
+    thresholds = np.array(
+        [
+            -np.inf if p <= 0 else np.inf if p >= 1 else inverse_cdf(p)
+            for p in probabilities.tolist()
+        ],
+        dtype=np.float64,
+    )
+    return GaussianCopula(
+        group_index=np.array([lookup[key] for key in keys], dtype=np.intp),
+        cholesky=_cholesky(matrix.astype(np.float64)),
+        shared=shared,
+        thresholds=thresholds,
+    )
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.database import in_batches
+from app.db.events import ChangeSet, on_commit
+from app.engine.analytics import snapshot_kpis
+from app.engine.snapshot import PortfolioSnapshot
+from app.models.models import KPISnapshot
+
+KPI_COLUMNS = ("ev", "ac", "pv", "cv", "sv", "cpi", "spi")
+
+
+def kpi_rows(snapshot: PortfolioSnapshot, as_of: date) -> list[dict]:
+    kpis = snapshot_kpis(snapshot, as_of)
+    columns = [kpis["project_id"].tolist()] + [kpis[name].tolist() for name in KPI_COLUMNS]
+    return [
+        {"project_id": row[0], "as_of": as_of, **dict(zip(KPI_COLUMNS, row[1:]))}
+        for row in zip(*columns)
+    ]
+
+
+def write_kpi_snapshots(
+    db: Session, snapshot: PortfolioSnapshot, days: Iterable[date]
+) -> int:
+    """Store one row per project and day from ``snapshot``.
+
+    Today's rows are replaced. Rows already recorded for any other day are kept, and only
+    projects without a row for that day get one. Projects are written in batches that keep each
+    ``IN`` list within ``MAX_IN_PARAMETERS``.
+    """
+    today = date.today()
+    written = 0
+    for day in days:
+        if not len(snapshot):
+            break
+        for rows in in_batches(kpi_rows(snapshot, day)):
+            ids = [row["project_id"] for row in rows]
+            on_day = (KPISnapshot.as_of == day, KPISnapshot.project_id.in_(ids))
+            if day == today:
+                db.execute(delete(KPISnapshot).where(*on_day))
+            else:
+                recorded = set(db.scalars(select(KPISnapshot.project_id).where(*on_day)))
+                rows = [row for row in rows if row["project_id"] not in recorded]
+            if rows:
+                db.execute(insert(KPISnapshot), rows)
+                written += len(rows)
+    db.commit()
+    return written
+
+
+def backfill_kpi_snapshots(
+    db: Session,
+    start: date,
+    end: date,
+    project_ids: Iterable[int] | None = None,
+) -> int:
+    """Bulk-write daily rows for ``start``..``end`` from the projects' current state.
+
+    Backfilled past rows are approximations: they apply today's spend, forecast and progress to
+    each day. Days that already have a row for a project keep it.
+    """
+    snapshot = PortfolioSnapshot.load(db, project_ids)
+    days = (start + timedelta(days=offset) for offset in range((end - start).days + 1))
+    return write_kpi_snapshots(db, snapshot, days)
+
+
+def kpi_history(
+    db: Session, start: date, end: date, project_id: int | None = None
+) -> list[KPISnapshot]:
+    query = db.query(KPISnapshot).filter(KPISnapshot.as_of >= start, KPISnapshot.as_of <= end)
+    if project_id is not None:
+        query = query.filter(KPISnapshot.project_id == project_id)
+    return query.order_by(KPISnapshot.project_id, KPISnapshot.as_of).all()
+
+
+@on_commit
+def _snapshot_changed_projects(changes: ChangeSet) -> None:
+    project_ids = changes.tables.get("projects")
+    if not project_ids or changes.bind is None:
+        return
+    with Session(bind=changes.bind) as db:
+        snapshot = PortfolioSnapshot.load(db, project_ids)
+        if len(snapshot):
+            write_kpi_snapshots(db, snapshot, [date.today()])
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.engine.analytics import (
+    DEFAULT_PERCENTILES,
+    PortfolioArrays,
+    pack_portfolio,
+    pack_project,
+    project_copula,
+    requested_percentiles,
+    simulate_portfolio,
+    simulate_project,
+    stream_project,
+    summarize_histograms,
+    summarize_portfolio,
+    summarize_project,
+)
+from app.engine.correlation import CorrelationModel, GaussianCopula
+from app.engine.quantiles import DEFAULT_BINS, QuantileHistogram
+from app.models.models import Project, RiskItem
+
+
+@dataclass
+class ScenarioPlan:
+    function: Callable[..., Any]
+    shards: list[tuple]
+    combine: Callable[[list[Any]], dict]
+
+
+def _project_shard(
+    base: np.ndarray,
+    probabilities: np.ndarray,
+    impacts: np.ndarray,
+    iterations: int,
+    seed: np.random.SeedSequence,
+    sampler: str,
+    copula: GaussianCopula | None,
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return simulate_project(base, probabilities, impacts, iterations, rng, sampler, copula)
+
+
+def _project_stream_shard(
+    base: np.ndarray,
+    probabilities: np.ndarray,
+    impacts: np.ndarray,
+    iterations: int,
+    seed: np.random.SeedSequence,
+    sampler: str,
+    bins: int,
+    copula: GaussianCopula | None,
+) -> list[QuantileHistogram]:
+    rng = np.random.default_rng(seed)
+    return stream_project(base, probabilities, impacts, iterations, rng, sampler, bins, copula)
+
+
+def _portfolio_shard(
+    portfolio: PortfolioArrays,
+    iterations: int,
+    seed: np.random.SeedSequence,
+    factor_seed: np.random.SeedSequence,
+) -> tuple[list[dict], np.ndarray]:
+    rng, factor_rng = np.random.default_rng(seed), np.random.default_rng(factor_seed)
+    return simulate_portfolio(portfolio, iterations, rng, factor_rng)
+
+
+def _combine_project(outputs: list[np.ndarray], percentiles: Sequence[float]) -> dict:
+    return summarize_project(np.concatenate(outputs), percentiles)
+
+
+def _combine_project_histograms(
+    outputs: list[list[QuantileHistogram]], percentiles: Sequence[float]
+) -> dict:
+    merged = outputs[0]
+    for histograms in outputs[1:]:
+        for target, histogram in zip(merged, histograms):
+            target.merge(histogram)
+    return summarize_histograms(merged, percentiles)
+
+
+def _combine_portfolio(outputs: list[tuple[list[dict], np.ndarray]]) -> dict:
+    results = [item for shard_results, _ in outputs for item in shard_results]
+    return summarize_portfolio(results, sum(cost for _, cost in outputs))
+
+
+def project_plan(
+    project: Project,
+    risks: list[RiskItem],
+    iterations: int = 1000,
+    inflation_factor: float = 1.0,
+    staffing_capacity_factor: float = 1.0,
+    risk_mitigation_effectiveness: float = 1.0,
+    seed: int | None = None,
+    sampler: str = "random",
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    streaming: bool = False,
+    bins: int = DEFAULT_BINS,
+    correlation: CorrelationModel | None = None,
+    shard_size: int | None = None,
+) -> ScenarioPlan:
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+    percentiles = requested_percentiles(percentiles)
+    shard_size = shard_size or get_settings().scenario_shard_size
+    base, probabilities, impacts = pack_project(
+        project, risks, inflation_factor, staffing_capacity_factor, risk_mitigation_effectiveness
+    )
+    copula = project_copula(project, risks, probabilities, correlation)
+    shard_iterations = max(shard_size // max(len(probabilities), 1), 1)
+    starts = range(0, iterations, shard_iterations)
+    counts = [min(shard_iterations, iterations - start) for start in starts]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    if streaming:
+        return ScenarioPlan(
+            function=_project_stream_shard,
+            shards=[
+                (base, probabilities, impacts, count, child, sampler, bins, copula)
+                for count, child in zip(counts, seeds)
+            ],
+            combine=partial(_combine_project_histograms, percentiles=percentiles),
+        )
+    return ScenarioPlan(
+        function=_project_shard,
+        shards=[
+            (base, probabilities, impacts, count, child, sampler, copula)
+            for count, child in zip(counts, seeds)
+        ],
+        combine=partial(_combine_project, percentiles=percentiles),
+    )
+
+
+def portfolio_plan(
+    projects: list[Project],
+    risks: list[RiskItem],
+    iterations: int = 1000,
+    inflation_factor: float = 1.0,
+    staffing_capacity_factor: float = 1.0,
+    risk_mitigation_effectiveness: float = 1.0,
+    seed: int | None = None,
+    correlation: CorrelationModel | None = None,
+    shard_size: int | None = None,
+) -> ScenarioPlan:
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+    shard_size = shard_size or get_settings().scenario_shard_size
+    portfolio = pack_portfolio(
+        projects,
+        risks,
+        inflation_factor,
+        staffing_capacity_factor,
+        risk_mitigation_effectiveness,
+        correlation,
+    )
+    max_risks = max(shard_size // iterations, 1)
+    offsets = portfolio.risk_offsets
+    bounds = []
+    start = 0
+    while start < len(projects):
+        stop = start + 1
+        while stop < len(projects) and offsets[stop + 1] - offsets[start] <= max_risks:
+            stop += 1
+        bounds.append((start, stop))
+        start = stop
+    bounds = bounds or [(0, 0)]
+    # The extra child seeds the shared correlation factors, identical in every shard.
+    *seeds, factor_seed = np.random.SeedSequence(seed).spawn(len(bounds) + 1)
+    return ScenarioPlan(
+        function=_portfolio_shard,
+        shards=[
+            (portfolio.select(start, stop), iterations, child, factor_seed)
+            for (start, stop), child in zip(bounds, seeds)
+        ],
+        combine=_combine_portfolio,
+    )
+
+
+class ScenarioExecutor:
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max(max_workers or get_settings().scenario_workers, 1)
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _inline(self, plan: ScenarioPlan) -> bool:
+        return self.max_workers == 1 or len(plan.shards) == 1
+
+    def run(self, plan: ScenarioPlan) -> dict:
+        if self._inline(plan):
+            return plan.combine([plan.function(*shard) for shard in plan.shards])
+        pool = self._get_pool()
+        futures = [pool.submit(plan.function, *shard) for shard in plan.shards]
+        return plan.combine([future.result() for future in futures])
+
+    async def run_async(self, plan: ScenarioPlan) -> dict:
+        if self._inline(plan):
+            return await asyncio.to_thread(self.run, plan)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        outputs = await asyncio.gather(
+            *(loop.run_in_executor(pool, plan.function, *shard) for shard in plan.shards)
+        )
+        return await asyncio.to_thread(plan.combine, list(outputs))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+scenario_executor = ScenarioExecutor()
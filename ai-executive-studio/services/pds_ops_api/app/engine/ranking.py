@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.engine.analytics import attention_scores, snapshot_kpis
+from app.engine.snapshot import PortfolioSnapshot, SnapshotStore, portfolio_snapshot
+
+# Sorted so that index order matches rank_snapshot: score descending, then project id.
+_Key = tuple[float, int]
+
+
+@dataclass
+class _Entry:
+    key: _Key
+    region: str
+    sector: str
+    row: dict[str, float]
+
+
+class RankingIndex:
+    """Attention ranking kept in sorted indexes and updated only for refreshed projects.
+
+    Scores come from ``attention_scores``, the same function the full ``rank_snapshot`` path
+    uses. The whole index is rebuilt when the date rolls over, since planned value depends on it.
+    """
+
+    def __init__(self, store: SnapshotStore) -> None:
+        self._store = store
+        self._lock = threading.Lock()
+        self._source: PortfolioSnapshot | None = None
+        self._as_of: date | None = None
+        self._entries: dict[int, _Entry] = {}
+        self._order: list[_Key] = []
+        self._by_region: dict[str, list[_Key]] = {}
+        self._by_sector: dict[str, list[_Key]] = {}
+        self.rebuilds = 0
+        self.updates = 0
+        store.on_refresh(self._on_refresh)
+
+    def _on_refresh(self, snapshot: PortfolioSnapshot, project_ids: set[int] | None) -> None:
+        with self._lock:
+            if project_ids is None or self._as_of is None:
+                self._source, self._as_of = snapshot, None
+            else:
+                self._source = snapshot
+                self._update(snapshot, project_ids)
+
+    def _score(self, snapshot: PortfolioSnapshot) -> list[_Entry]:
+        kpis = snapshot_kpis(snapshot, self._as_of)
+        scores = attention_scores(snapshot, kpis)
+        columns = zip(
+            snapshot.project_ids.tolist(),
+            scores.tolist(),
+            kpis["cv"].tolist(),
+            kpis["sv"].tolist(),
+            snapshot.risk_exposure.tolist(),
+            snapshot.regions.tolist(),
+            snapshot.sectors.tolist(),
+        )
+        return [
+            _Entry(
+                key=(-score, project_id),
+                region=region,
+                sector=sector,
+                row={
+                    "project_id": project_id,
+                    "attention_score": score,
+                    "cv": cv,
+                    "sv": sv,
+                    "risk_exposure": exposure,
+                },
+            )
+            for project_id, score, cv, sv, exposure, region, sector in columns
+        ]
+
+    def _rebuild(self, snapshot: PortfolioSnapshot, as_of: date) -> None:
+        self._as_of = as_of
+        entries = sorted(self._score(snapshot), key=lambda item: item.key)
+        self._entries = {entry.key[1]: entry for entry in entries}
+        self._order = [entry.key for entry in entries]
+        self._by_region, self._by_sector = {}, {}
+        for entry in entries:
+            self._by_region.setdefault(entry.region, []).append(entry.key)
+            self._by_sector.setdefault(entry.sector, []).append(entry.key)
+        self.rebuilds += 1
+
+    def _update(self, snapshot: PortfolioSnapshot, project_ids: set[int]) -> None:
+        for project_id in project_ids:
+            entry = self._entries.pop(project_id, None)
+            if entry is not None:
+                _discard(self._order, entry.key)
+                _discard(self._by_region[entry.region], entry.key)
+                _discard(self._by_sector[entry.sector], entry.key)
+        ids = np.array(sorted(project_ids), dtype=np.int64)
+        positions = np.searchsorted(snapshot.project_ids, ids)
+        found = positions < len(snapshot)
+        found[found] = snapshot.project_ids[positions[found]] == ids[found]
+        for entry in self._score(snapshot.take(positions[found])):
+            self._entries[entry.key[1]] = entry
+            insort(self._order, entry.key)
+            insort(self._by_region.setdefault(entry.region, []), entry.key)
+            insort(self._by_sector.setdefault(entry.sector, []), entry.key)
+        self.updates += 1
+
+    def top(
+        self,
+        db: Session,
+        limit: int | None = None,
+        offset: int = 0,
+        region: str | None = None,
+        sector: str | None = None,
+        as_of: date | None = None,
+    ) -> tuple[list[dict[str, float]], int]:
+        """Return one page of the ranking and the number of projects matching the filters."""
+        snapshot = self._store.get(db)
+        as_of = as_of or date.today()
+        with self._lock:
+            if self._source is None:
+                self._source = snapshot
+            if self._as_of != as_of:
+                self._rebuild(self._source, as_of)
+            by_region = self._by_region.get(region, []) if region is not None else None
+            by_sector = self._by_sector.get(sector, []) if sector is not None else None
+            if by_region is not None and by_sector is not None:
+                # Walk the shorter index and check the other attribute.
+                if len(by_region) <= len(by_sector):
+                    keys = [key for key in by_region if self._entries[key[1]].sector == sector]
+                else:
+                    keys = [key for key in by_sector if self._entries[key[1]].region == region]
+            else:
+                keys = by_region if by_region is not None else by_sector
+                if keys is None:
+                    keys = self._order
+            stop = None if limit is None else offset + limit
+            return [dict(self._entries[key[1]].row) for key in keys[offset:stop]], len(keys)
+
+
+def _discard(keys: list[_Key], key: _Key) -> None:
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
+
+
+ranking_index = RankingIndex(portfolio_snapshot)
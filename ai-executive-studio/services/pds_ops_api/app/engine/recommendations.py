@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import date
 from typing import Iterable
 
-from app.engine.analytics import calculate_kpi
+from app.engine.rules import Rule, RuleContext, RuleRegistry
+from app.engine.snapshot import PortfolioSnapshot
 from app.models.models import Project, RiskItem, ProcessTemplate, RuleFeedback
 
 
@@ -17,11 +19,62 @@ class Recommendation:
     rule_key: str
 
 
-def _rule_confidence(rule_key: str, feedback: Iterable[RuleFeedback]) -> float:
+DEFAULT_CONFIDENCE = 0.5
+
+recommendation_rules = RuleRegistry()
+recommendation_rules.register(
+    Rule(
+        key="schedule_slip_priority",
+        decision_type="escalate",
+        predicate=lambda c: (c["spi"] < 0.9) & (c["client_priority"] >= 4),
+        impact={"schedule_recovery_days": 10, "resource_shift": "increase"},
+        explanation=(
+            "SPI {spi:.2f} below 0.90 with client priority {client_priority}; "
+            "recommend escalation and resource reallocation."
+        ),
+    )
+)
+recommendation_rules.register(
+    Rule(
+        key="cost_overrun",
+        decision_type="risk_mitigation",
+        predicate=lambda c: c["cpi"] < 0.9,
+        impact={"cost_control": True, "target_cpi": 0.95},
+        explanation=(
+            "CPI {cpi:.2f} below 0.90; recommend cost controls and risk mitigation actions."
+        ),
+    )
+)
+recommendation_rules.register(
+    Rule(
+        key="standardize_schedule_controls",
+        decision_type="standardize_process",
+        scope="portfolio",
+        predicate=lambda c: c.risk_counts.get("schedule", 0) >= 3 and c.template is not None,
+        impact=lambda c: {"template_id": c.template.id, "adoption_target": 0.75},
+        explanation=(
+            "Schedule risks recurring across portfolio; recommend standardizing process "
+            "using template '{template_name}'."
+        ),
+    )
+)
+recommendation_rules.register(
+    Rule(
+        key="staff_training_gap",
+        decision_type="staffing_training",
+        scope="portfolio",
+        predicate=lambda c: c.risk_counts.get("scope", 0) >= 3,
+        impact={"training_focus": "scope control", "target_completion": "Q4"},
+        explanation="Repeated scope-related risks suggest a skill gap; recommend training program.",
+    )
+)
+
+
+def _confidence_index(feedback: Iterable[RuleFeedback]) -> dict[str, float]:
+    index: dict[str, float] = {}
     for item in feedback:
-        if item.rule_key == rule_key:
-            return item.success_rate
-    return 0.5
+        index.setdefault(item.rule_key, item.success_rate)
+    return index
 
 
 def generate_recommendations(
@@ -30,80 +83,30 @@ def generate_recommendations(
     templates: list[ProcessTemplate],
     feedback: Iterable[RuleFeedback],
 ) -> list[Recommendation]:
-    recommendations: list[Recommendation] = []
-    risk_map: dict[int, float] = {}
-    risk_category_count: dict[str, int] = {}
+    snapshot = PortfolioSnapshot.from_objects(projects, risks)
+    return recommend_from_snapshot(snapshot, templates, feedback)
 
-    for risk in risks:
-        risk_map.setdefault(risk.project_id, 0.0)
-        risk_map[risk.project_id] += risk.probability * (risk.impact_cost + risk.impact_days * 1000)
-        risk_category_count[risk.category] = risk_category_count.get(risk.category, 0) + 1
 
-    for project in projects:
-        kpi = calculate_kpi(project)
-        client_priority = project.client.strategic_priority if project.client else 1
-        if kpi.spi < 0.9 and client_priority >= 4:
-            rule_key = "schedule_slip_priority"
-            recommendations.append(
-                Recommendation(
-                    decision_type="escalate",
-                    affected_project_ids=[project.id],
-                    expected_impact={"schedule_recovery_days": 10, "resource_shift": "increase"},
-                    explanation=(
-                        f"SPI {kpi.spi:.2f} below 0.90 with client priority {client_priority}; "
-                        "recommend escalation and resource reallocation."
-                    ),
-                    confidence=_rule_confidence(rule_key, feedback),
-                    rule_key=rule_key,
-                )
-            )
-
-        if kpi.cpi < 0.9:
-            rule_key = "cost_overrun"
-            recommendations.append(
-                Recommendation(
-                    decision_type="risk_mitigation",
-                    affected_project_ids=[project.id],
-                    expected_impact={"cost_control": True, "target_cpi": 0.95},
-                    explanation=(
-                        f"CPI {kpi.cpi:.2f} below 0.90; recommend cost controls and risk mitigation actions."
-                    ),
-                    confidence=_rule_confidence(rule_key, feedback),
-                    rule_key=rule_key,
-                )
-            )
-
-    if risk_category_count.get("schedule", 0) >= 3 and templates:
-        template = templates[0]
-        rule_key = "standardize_schedule_controls"
-        recommendations.append(
-            Recommendation(
-                decision_type="standardize_process",
-                affected_project_ids=[p.id for p in projects],
-                expected_impact={"template_id": template.id, "adoption_target": 0.75},
-                explanation=(
-                    "Schedule risks recurring across portfolio; recommend standardizing process "
-                    f"using template '{template.name}'."
-                ),
-                confidence=_rule_confidence(rule_key, feedback),
-                rule_key=rule_key,
-            )
-        )
-
-    if risk_category_count.get("scope", 0) >= 3:
-        rule_key = "staff_training_gap"
-        recommendations.append(
-            Recommendation(
-                decision_type="staffing_training",
-                affected_project_ids=[p.id for p in projects],
-                expected_impact={"training_focus": "scope control", "target_completion": "Q4"},
-                explanation="Repeated scope-related risks suggest a skill gap; recommend training program.",
-                confidence=_rule_confidence(rule_key, feedback),
-                rule_key=rule_key,
-            )
+def recommend_from_snapshot(
+    snapshot: PortfolioSnapshot,
+    templates: list[ProcessTemplate],
+    feedback: Iterable[RuleFeedback],
+    as_of: date | None = None,
+    rules: RuleRegistry = recommendation_rules,
+) -> list[Recommendation]:
+    confidence = _confidence_index(feedback)
+    matches = rules.evaluate(RuleContext.from_snapshot(snapshot, templates, as_of))
+    return [
+        Recommendation(
+            decision_type=match.rule.decision_type,
+            affected_project_ids=match.affected_project_ids,
+            expected_impact=match.expected_impact,
+            explanation=match.explanation,
+            confidence=confidence.get(match.rule.key, DEFAULT_CONFIDENCE),
+            rule_key=match.rule.key,
         )
-
-    return recommendations
+        for match in matches
+    ]
 
 
 def update_rule_feedback(rule_key: str, was_successful: bool, feedback: RuleFeedback) -> RuleFeedback:
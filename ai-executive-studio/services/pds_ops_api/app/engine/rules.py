@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from string import Formatter
+from typing import Callable, Iterator, Literal, Mapping, Sequence
+
+import numpy as np
+
+from app.engine.analytics import snapshot_kpis
+from app.engine.snapshot import PortfolioSnapshot
+from app.models.models import ProcessTemplate
+
+
+@dataclass
+class RuleContext:
+    """Columns a rule predicate reads, aligned with ``project_ids``, plus portfolio aggregates."""
+
+    project_ids: list[int]
+    columns: dict[str, np.ndarray]
+    risk_counts: dict[str, int]
+    templates: Sequence[ProcessTemplate]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def template(self) -> ProcessTemplate | None:
+        return self.templates[0] if self.templates else None
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: PortfolioSnapshot,
+        templates: Sequence[ProcessTemplate],
+        as_of: date | None = None,
+    ) -> RuleContext:
+        columns = dict(snapshot_kpis(snapshot, as_of))
+        for name in (
+            "client_priority",
+            "client_satisfaction",
+            "client_pipeline",
+            "safety_incidents",
+            "percent_complete",
+            "baseline_budget",
+            "current_forecast",
+            "risk_exposure",
+            "high_risk_count",
+        ):
+            columns[name] = getattr(snapshot, name)
+        return cls(
+            project_ids=snapshot.project_ids.tolist(),
+            columns=columns,
+            risk_counts=snapshot.category_totals(),
+            templates=templates,
+        )
+
+
+Predicate = Callable[[RuleContext], "np.ndarray | bool"]
+Impact = Mapping[str, object] | Callable[[RuleContext], dict]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A recommendation rule.
+
+    Project rules return a boolean mask over the portfolio and format ``explanation`` with the
+    matched project's columns. Portfolio rules return a single bool, apply to every project and
+    format ``explanation`` with ``template_id`` / ``template_name`` of the first process template.
+    """
+
+    key: str
+    decision_type: str
+    predicate: Predicate
+    impact: Impact
+    explanation: str
+    scope: Literal["project", "portfolio"] = "project"
+    fields: tuple[str, ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        names = tuple(name for _, name, _, _ in Formatter().parse(self.explanation) if name)
+        object.__setattr__(self, "fields", names)
+
+    def expected_impact(self, context: RuleContext) -> dict:
+        return self.impact(context) if callable(self.impact) else dict(self.impact)
+
+
+@dataclass
+class RuleMatch:
+    rule: Rule
+    affected_project_ids: list[int]
+    expected_impact: dict
+    explanation: str
+
+
+class RuleRegistry:
+    def __init__(self) -> None:
+        self._rules: dict[str, Rule] = {}
+
+    def register(self, rule: Rule) -> Rule:
+        if rule.key in self._rules:
+            raise ValueError(f"Rule '{rule.key}' is already registered")
+        self._rules[rule.key] = rule
+        return rule
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self._rules.values())
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def evaluate(self, context: RuleContext) -> list[RuleMatch]:
+        """Project matches ordered by project then rule, followed by portfolio matches."""
+        project_rules = [rule for rule in self if rule.scope == "project"]
+        matches: list[RuleMatch] = []
+        if project_rules and context.project_ids:
+            size = len(context.project_ids)
+            masks = np.stack(
+                [np.broadcast_to(rule.predicate(context), size) for rule in project_rules]
+            )
+            rule_indices, project_indices = np.nonzero(masks)
+            order = np.lexsort((rule_indices, project_indices))
+            rule_indices, project_indices = rule_indices[order], project_indices[order]
+            values = self._field_values(context, project_rules, project_indices)
+            for match, (rule_index, project_index) in enumerate(
+                zip(rule_indices.tolist(), project_indices.tolist())
+            ):
+                rule = project_rules[rule_index]
+                row = {name: values[name][match] for name in rule.fields}
+                matches.append(
+                    RuleMatch(
+                        rule=rule,
+                        affected_project_ids=[context.project_ids[project_index]],
+                        expected_impact=rule.expected_impact(context),
+                        explanation=rule.explanation.format(**row),
+                    )
+                )
+
+        template = context.template
+        portfolio_fields = {
+            "template_id": template.id if template else None,
+            "template_name": template.name if template else None,
+        }
+        for rule in self:
+            if rule.scope == "portfolio" and rule.predicate(context):
+                matches.append(
+                    RuleMatch(
+                        rule=rule,
+                        affected_project_ids=list(context.project_ids),
+                        expected_impact=rule.expected_impact(context),
+                        explanation=rule.explanation.format(**portfolio_fields),
+                    )
+                )
+        return matches
+
+    @staticmethod
+    def _field_values(
+        context: RuleContext,
+        rules: list[Rule],
+        project_indices: np.ndarray,
+    ) -> dict[str, list]:
+        # Gather each referenced column once for all matches instead of per recommendation.
+        names = {name for rule in rules for name in rule.fields}
+        return {name: context[name][project_indices].tolist() for name in names}
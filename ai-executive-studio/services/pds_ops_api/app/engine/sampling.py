@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import warnings
+from typing import Callable
+
+import numpy as np
+
+SAMPLERS = ("random", "lhs", "sobol")
+
+Sampler = Callable[[int], np.ndarray]
+
+
+def make_sampler(kind: str, rng: np.random.Generator, dimensions: int) -> Sampler:
+    if kind == "random":
+        return lambda rows: rng.random((rows, dimensions))
+    if kind == "lhs":
+        # One Latin hypercube design per call: every column hits each of the `rows` strata once.
+        def latin_hypercube(rows: int) -> np.ndarray:
+            strata = rng.permuted(np.tile(np.arange(rows), (dimensions, 1)), axis=1).T
+            return (strata + rng.random((rows, dimensions))) / rows
+
+        return latin_hypercube
+    if kind == "sobol":
+        try:
+            from scipy.stats import qmc
+        except ImportError as exc:
+            raise ValueError("Sobol sampling requires scipy (pip install -e .[qmc])") from exc
+        engine = qmc.Sobol(d=dimensions, scramble=True, seed=rng)
+
+        def sobol(rows: int) -> np.ndarray:
+            with warnings.catch_warnings():
+                # Balance is best at powers of two; arbitrary batch sizes remain valid draws.
+                warnings.simplefilter("ignore", UserWarning)
+                return engine.random(rows)
+
+        return sobol
+    raise ValueError(f"Unknown sampler '{kind}', expected one of {', '.join(SAMPLERS)}")
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, fields
+from typing import Callable, Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.db.database import MAX_IN_PARAMETERS, in_batches
+from app.db.events import ChangeSet, on_commit, read_versions
+from app.models.models import Client, Project, RiskItem
+
+HIGH_RISK_PROBABILITY = 0.6
+# Tables the snapshot is built from.
+SNAPSHOT_TABLES = ("projects", "clients", "risks")
+
+_PROJECT_COLUMNS = (
+    Project.id,
+    Project.client_id,
+    Project.region,
+    Project.sector,
+    Project.start_date,
+    Project.end_date,
+    Project.baseline_budget,
+    Project.current_forecast,
+    Project.actual_spend,
+    Project.baseline_schedule_days,
+    Project.forecast_schedule_days,
+    Project.percent_complete,
+    Project.safety_incidents,
+    Client.strategic_priority,
+    Client.satisfaction_score,
+    Client.pipeline_value,
+)
+# Fallbacks for NULL columns and projects without a client, matching the model defaults.
+_PROJECT_DEFAULTS = (0, 0, "", "", None, None, 0.0, 0.0, 0.0, 0, 0, 0.0, 0, 1, 0.0, 0.0)
+
+
+@dataclass
+class PortfolioSnapshot:
+    """Column arrays for every project, aligned by position, plus per-project risk aggregates."""
+
+    project_ids: np.ndarray
+    client_ids: np.ndarray
+    regions: np.ndarray
+    sectors: np.ndarray
+    start_ordinals: np.ndarray
+    end_ordinals: np.ndarray
+    baseline_budget: np.ndarray
+    current_forecast: np.ndarray
+    actual_spend: np.ndarray
+    baseline_schedule_days: np.ndarray
+    forecast_schedule_days: np.ndarray
+    percent_complete: np.ndarray
+    safety_incidents: np.ndarray
+    client_priority: np.ndarray
+    client_satisfaction: np.ndarray
+    client_pipeline: np.ndarray
+    risk_exposure: np.ndarray
+    high_risk_count: np.ndarray
+    risk_categories: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.project_ids)
+
+    def take(self, indices: np.ndarray) -> PortfolioSnapshot:
+        columns = {
+            item.name: getattr(self, item.name)[indices]
+            for item in fields(self)
+            if item.name != "risk_categories"
+        }
+        categories = {name: counts[indices] for name, counts in self.risk_categories.items()}
+        return PortfolioSnapshot(**columns, risk_categories=categories)
+
+    def category_totals(self) -> dict[str, int]:
+        return {name: int(counts.sum()) for name, counts in self.risk_categories.items()}
+
+    @classmethod
+    def from_rows(
+        cls,
+        project_rows: Sequence[tuple],
+        risk_rows: Iterable[tuple[int, str, int, int, float]],
+    ) -> PortfolioSnapshot:
+        """Build from project column rows and (project_id, category, count, high, exposure) rows."""
+        rows = [
+            tuple(
+                default if value is None else value
+                for value, default in zip(row, _PROJECT_DEFAULTS)
+            )
+            for row in project_rows
+        ]
+        columns = list(zip(*rows)) if rows else [()] * len(_PROJECT_DEFAULTS)
+        project_ids = np.array(columns[0], dtype=np.int64)
+        position = {project_id: index for index, project_id in enumerate(project_ids.tolist())}
+
+        risk_exposure = np.zeros(len(rows))
+        high_risk_count = np.zeros(len(rows), dtype=np.int64)
+        risk_categories: dict[str, np.ndarray] = {}
+        for project_id, category, count, high, exposure in risk_rows:
+            index = position.get(project_id)
+            if index is None:
+                continue
+            counts = risk_categories.setdefault(category, np.zeros(len(rows), dtype=np.int64))
+            counts[index] += count
+            high_risk_count[index] += high
+            risk_exposure[index] += exposure
+
+        return cls(
+            project_ids=project_ids,
+            client_ids=np.array(columns[1], dtype=np.int64),
+            regions=np.array(columns[2], dtype=object),
+            sectors=np.array(columns[3], dtype=object),
+            start_ordinals=np.array([day.toordinal() for day in columns[4]], dtype=np.int64),
+            end_ordinals=np.array([day.toordinal() for day in columns[5]], dtype=np.int64),
+            baseline_budget=np.array(columns[6], dtype=float),
+            current_forecast=np.array(columns[7], dtype=float),
+            actual_spend=np.array(columns[8], dtype=float),
+            baseline_schedule_days=np.array(columns[9], dtype=np.int64),
+            forecast_schedule_days=np.array(columns[10], dtype=np.int64),
+            percent_complete=np.array(columns[11], dtype=float),
+            safety_incidents=np.array(columns[12], dtype=np.int64),
+            client_priority=np.array(columns[13], dtype=np.int64),
+            client_satisfaction=np.array(columns[14], dtype=float),
+            client_pipeline=np.array(columns[15], dtype=float),
+            risk_exposure=risk_exposure,
+            high_risk_count=high_risk_count,
+            risk_categories=risk_categories,
+        )
+
+    @classmethod
+    def from_objects(
+        cls, projects: Sequence[Project], risks: Iterable[RiskItem]
+    ) -> PortfolioSnapshot:
+        """Build from ORM objects; load them with ``joinedload(Project.client)`` to avoid N+1."""
+        project_rows = []
+        for project in projects:
+            client = project.client
+            project_rows.append(
+                (
+                    project.id,
+                    project.client_id,
+                    project.region,
+                    project.sector,
+                    project.start_date,
+                    project.end_date,
+                    project.baseline_budget,
+                    project.current_forecast,
+                    project.actual_spend,
+                    project.baseline_schedule_days,
+                    project.forecast_schedule_days,
+                    project.percent_complete,
+                    project.safety_incidents,
+                    client.strategic_priority if client else None,
+                    client.satisfaction_score if client else None,
+                    client.pipeline_value if client else None,
+                )
+            )
+        risk_rows = (
+            (
+                risk.project_id,
+                risk.category,
+                1,
+                int(risk.probability > HIGH_RISK_PROBABILITY),
+                risk.probability * (risk.impact_cost + risk.impact_days * 1000),
+            )
+            for risk in risks
+        )
+        return cls.from_rows(project_rows, risk_rows)
+
+    @classmethod
+    def load(cls, db: Session, project_ids: Iterable[int] | None = None) -> PortfolioSnapshot:
+        """Load all projects (or just ``project_ids``) with one column query and one aggregate.
+
+        Long ``project_ids`` lists are loaded in batches of ``MAX_IN_PARAMETERS``.
+        """
+        projects = (
+            select(*_PROJECT_COLUMNS)
+            .outerjoin(Client, Project.client_id == Client.id)
+            .order_by(Project.id)
+        )
+        risks = select(
+            RiskItem.project_id,
+            RiskItem.category,
+            func.count(),
+            func.sum(case((RiskItem.probability > HIGH_RISK_PROBABILITY, 1), else_=0)),
+            func.sum(RiskItem.probability * (RiskItem.impact_cost + RiskItem.impact_days * 1000)),
+        ).group_by(RiskItem.project_id, RiskItem.category)
+        if project_ids is not None:
+            ids = sorted(project_ids)
+            if len(ids) > MAX_IN_PARAMETERS:
+                batches = in_batches(ids, MAX_IN_PARAMETERS)
+                return cls.concat([cls.load(db, batch) for batch in batches])
+            projects = projects.where(Project.id.in_(ids))
+            risks = risks.where(RiskItem.project_id.in_(ids))
+        return cls.from_rows(
+            db.execute(projects).all(),
+            ((pid, category, count, high or 0, exposure or 0.0)
+             for pid, category, count, high, exposure in db.execute(risks)),
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence[PortfolioSnapshot]) -> PortfolioSnapshot:
+        columns = {
+            item.name: np.concatenate([getattr(part, item.name) for part in parts])
+            for item in fields(cls)
+            if item.name != "risk_categories"
+        }
+        names = sorted({name for part in parts for name in part.risk_categories})
+        categories = {
+            name: np.concatenate(
+                [
+                    part.risk_categories.get(name, np.zeros(len(part), dtype=np.int64))
+                    for part in parts
+                ]
+            )
+            for name in names
+        }
+        return cls(**columns, risk_categories=categories)
+
+
+# Called with the new snapshot and the refreshed project ids (None after a full load).
+RefreshListener = Callable[[PortfolioSnapshot, "set[int] | None"], None]
+
+
+class SnapshotStore:
+    """Process-wide portfolio snapshot, refreshed lazily for projects touched by commits.
+
+    Each ``get`` also reads the ``data_versions`` counters of ``SNAPSHOT_TABLES``. If they moved
+    past the versions this process's own commits account for, another process wrote to the
+    portfolio and the snapshot is reloaded in full.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._dirty_lock = threading.Lock()
+        self._snapshot: PortfolioSnapshot | None = None
+        self._bind = None
+        self._dirty_projects: set[int] = set()
+        self._dirty_clients: set[int] = set()
+        self._versions: dict[str, int] = {}
+        self._own_versions: dict[str, set[int]] = {}
+        self._listeners: list[RefreshListener] = []
+        self.full_loads = 0
+        self.partial_loads = 0
+
+    def on_refresh(self, listener: RefreshListener) -> RefreshListener:
+        self._listeners.append(listener)
+        return listener
+
+    def invalidate(self, changes: ChangeSet) -> None:
+        with self._dirty_lock:
+            self._dirty_projects.update(changes.projects)
+            self._dirty_clients.update(changes.tables.get("clients", ()))
+            for table, version in changes.versions.items():
+                if table in SNAPSHOT_TABLES:
+                    self._own_versions.setdefault(table, set()).add(version)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._bind = None
+
+    def get(self, db: Session) -> PortfolioSnapshot:
+        with self._lock:
+            with self._dirty_lock:
+                dirty_projects, self._dirty_projects = self._dirty_projects, set()
+                dirty_clients, self._dirty_clients = self._dirty_clients, set()
+                previous_versions = self._versions
+            try:
+                bind = db.get_bind()
+                versions = read_versions(db, SNAPSHOT_TABLES)
+                written_elsewhere = self._advance_versions(versions)
+                snapshot = self._snapshot
+                if snapshot is None or bind is not self._bind or written_elsewhere:
+                    snapshot, refreshed = PortfolioSnapshot.load(db), None
+                    self.full_loads += 1
+                elif dirty_projects or dirty_clients:
+                    if dirty_clients:
+                        in_clients = np.isin(snapshot.client_ids, list(dirty_clients))
+                        dirty_projects.update(snapshot.project_ids[in_clients].tolist())
+                    snapshot = self._refresh(db, snapshot, dirty_projects)
+                    refreshed = dirty_projects
+                    self.partial_loads += 1
+                else:
+                    return snapshot
+            except Exception:
+                # Put back what this call consumed, so the next one retries the refresh.
+                with self._dirty_lock:
+                    self._dirty_projects.update(dirty_projects)
+                    self._dirty_clients.update(dirty_clients)
+                    self._versions = previous_versions
+                raise
+            self._snapshot, self._bind = snapshot, bind
+            for listener in self._listeners:
+                listener(snapshot, refreshed)
+            return snapshot
+
+    def _advance_versions(self, versions: dict[str, int]) -> bool:
+        # True when a version between the last seen and ``versions`` came from another process.
+        with self._dirty_lock:
+            foreign = False
+            for table, current in versions.items():
+                own = self._own_versions.get(table, set())
+                missed = range(self._versions.get(table, 0) + 1, current + 1)
+                foreign = foreign or len(missed) > len(own) or any(v not in own for v in missed)
+                self._own_versions[table] = {version for version in own if version > current}
+            self._versions = versions
+            return foreign
+
+    @staticmethod
+    def _refresh(
+        db: Session, snapshot: PortfolioSnapshot, project_ids: set[int]
+    ) -> PortfolioSnapshot:
+        ids = np.array(sorted(project_ids), dtype=np.int64)
+        kept = snapshot.take(np.flatnonzero(~np.isin(snapshot.project_ids, ids)))
+        merged = PortfolioSnapshot.concat([kept, PortfolioSnapshot.load(db, ids.tolist())])
+        return merged.take(np.argsort(merged.project_ids, kind="stable"))
+
+
+portfolio_snapshot = SnapshotStore()
+
+
+@on_commit
+def _invalidate_snapshot(changes: ChangeSet) -> None:
+    portfolio_snapshot.invalidate(changes)
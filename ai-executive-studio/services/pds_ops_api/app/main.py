@@ -1,21 +1,45 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.response_cache import ResponseCacheMiddleware
 from app.api.routes import router
-from app.db.database import Base, engine
+from app.core.config import get_settings
+from app.db.database import engine
+from app.db.migrations import migrate
+from app.engine.parallel import scenario_executor
+
+migrate(engine)
+
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop the scenario worker processes on shutdown and on each --reload restart.
+    scenario_executor.shutdown()
 
-app = FastAPI(title="AI Executive (PDS Ops)")
 
+app = FastAPI(title="AI Executive (PDS Ops)", lifespan=lifespan)
+
+# Added before CORS so that CORS wraps it and cached responses get CORS headers too.
+if get_settings().response_cache_backend != "off":
+    app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
-app.include_router(router)
+if get_settings().database_async:
+    from app.api.async_routes import with_async_reads
+
+    app.include_router(with_async_reads(router))
+else:
+    app.include_router(router)
@@ -9,8 +9,11 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     JSON,
     Text,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import relationship
 
@@ -21,7 +24,7 @@ class Client(Base):
     __tablename__ = "clients"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     satisfaction_score = Column(Float, default=0.0)
     pipeline_value = Column(Float, default=0.0)
     strategic_priority = Column(Integer, default=1)
@@ -31,13 +34,28 @@ class Client(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Filtered so that any number of projects may have no external id (SQL Server otherwise
+        # treats NULL as a duplicate value in a unique index).
+        Index(
+            "ix_projects_external_id",
+            "external_id",
+            unique=True,
+            sqlite_where=text("external_id IS NOT NULL"),
+            mssql_where=text("external_id IS NOT NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
-    region = Column(String, nullable=False)
-    sector = Column(String, nullable=False)
-    start_date = Column(Date, nullable=False)
-    end_date = Column(Date, nullable=False)
+    # Identifier in the source system; imports in upsert mode match on it.
+    external_id = Column(String)
+    # Hash of the imported fields, used to skip rows that have not changed since the last sync.
+    content_hash = Column(String)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    region = Column(String, nullable=False, index=True)
+    sector = Column(String, nullable=False, index=True)
+    start_date = Column(Date, nullable=False, index=True)
+    end_date = Column(Date, nullable=False, index=True)
     baseline_budget = Column(Float, default=0.0)
     current_forecast = Column(Float, default=0.0)
     actual_spend = Column(Float, default=0.0)
@@ -45,7 +63,7 @@ class Project(Base):
     forecast_schedule_days = Column(Integer, default=0)
     percent_complete = Column(Float, default=0.0)
     safety_incidents = Column(Integer, default=0)
-    status = Column(String, default="active")
+    status = Column(String, default="active", index=True)
     last_updated = Column(DateTime, default=datetime.utcnow)
 
     client = relationship("Client", back_populates="projects")
@@ -56,9 +74,9 @@ class Resource(Base):
     __tablename__ = "resources"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
-    role = Column(String, nullable=False)
-    region = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
+    role = Column(String, nullable=False, index=True)
+    region = Column(String, nullable=False, index=True)
     skill_tags = Column(String, default="")
     utilization_pct = Column(Float, default=0.0)
 
@@ -67,12 +85,12 @@ class RiskItem(Base):
     __tablename__ = "risks"
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    category = Column(String, nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    category = Column(String, nullable=False, index=True)
     probability = Column(Float, default=0.0)
     impact_cost = Column(Float, default=0.0)
     impact_days = Column(Float, default=0.0)
-    mitigation_status = Column(String, default="open")
+    mitigation_status = Column(String, default="open", index=True)
 
     project = relationship("Project", back_populates="risks")
 
@@ -82,10 +100,10 @@ class Decision(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    decision_type = Column(String, nullable=False)
+    decision_type = Column(String, nullable=False, index=True)
     rationale = Column(Text, nullable=False)
     expected_impact_json = Column(JSON, default={})
-    status = Column(String, default="proposed")
+    status = Column(String, default="proposed", index=True)
     owner = Column(String, default="system")
     related_project_ids = Column(JSON, default=[])
     related_risk_ids = Column(JSON, default=[])
@@ -97,7 +115,7 @@ class Outcome(Base):
     __tablename__ = "outcomes"
 
     id = Column(Integer, primary_key=True, index=True)
-    decision_id = Column(Integer, ForeignKey("decisions.id"), nullable=False)
+    decision_id = Column(Integer, ForeignKey("decisions.id"), nullable=False, index=True)
     measured_at = Column(DateTime, default=datetime.utcnow)
     kpi_before_json = Column(JSON, default={})
     kpi_after_json = Column(JSON, default={})
@@ -110,7 +128,7 @@ class ProcessTemplate(Base):
     __tablename__ = "process_templates"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     description = Column(Text, default="")
     checklist_json = Column(JSON, default=[])
     adoption_rate_pct = Column(Float, default=0.0)
@@ -121,7 +139,7 @@ class GapInput(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    category = Column(String, nullable=False)
+    category = Column(String, nullable=False, index=True)
     question = Column(Text, nullable=False)
     answer = Column(Text, default="")
     confidence = Column(Float, default=0.0)
@@ -135,3 +153,30 @@ class RuleFeedback(Base):
     rule_key = Column(String, nullable=False, unique=True)
     success_rate = Column(Float, default=0.5)
     updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class KPISnapshot(Base):
+    __tablename__ = "kpi_snapshots"
+    __table_args__ = (
+        UniqueConstraint("project_id", "as_of", name="uq_kpi_snapshots_project_as_of"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    as_of = Column(Date, nullable=False, index=True)
+    ev = Column(Float, nullable=False)
+    ac = Column(Float, nullable=False)
+    pv = Column(Float, nullable=False)
+    cv = Column(Float, nullable=False)
+    sv = Column(Float, nullable=False)
+    cpi = Column(Float, nullable=False)
+    spi = Column(Float, nullable=False)
+
+
+class DataVersion(Base):
+    """Per-table counter bumped by every commit that writes the table, shared by all processes."""
+
+    __tablename__ = "data_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
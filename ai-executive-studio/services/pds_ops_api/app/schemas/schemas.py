@@ -46,6 +46,7 @@ class ProjectCreate(ProjectBase):
 
 class ProjectRead(ProjectBase):
     id: int
+    external_id: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -198,6 +199,19 @@ class PortfolioKPIResponse(BaseModel):
     totals: dict[str, float]
 
 
+class KPIHistoryPoint(KPIResult):
+    as_of: date
+
+    class Config:
+        from_attributes = True
+
+
+class ConvergenceDiagnostics(BaseModel):
+    converged: bool
+    tolerance: float
+    intervals: dict[str, tuple[float, float]]
+
+
 class ScenarioResult(BaseModel):
     project_id: int
     p50_cost: float
@@ -205,6 +219,40 @@ class ScenarioResult(BaseModel):
     p50_days: float
     p80_days: float
     iterations: int
+    convergence: Optional[ConvergenceDiagnostics] = None
+    percentiles: dict[str, float] = Field(default_factory=dict)
+    error_bounds: Optional[dict[str, float]] = None
+
+
+class ScenarioSweepRequest(BaseModel):
+    project_id: int
+    iterations: int = Field(default=1000, ge=1, le=1_000_000)
+    inflation_factors: list[float] = Field(
+        default_factory=lambda: [1.0], min_length=1, max_length=200
+    )
+    staffing_capacity_factors: list[float] = Field(
+        default_factory=lambda: [1.0], min_length=1, max_length=200
+    )
+    risk_mitigation_effectiveness: list[float] = Field(
+        default_factory=lambda: [1.0], min_length=1, max_length=200
+    )
+    seed: Optional[int] = None
+
+
+class ScenarioSweepResult(ScenarioSweepRequest):
+    # Rows follow risk_mitigation_effectiveness; cost columns follow inflation_factors and
+    # days columns follow staffing_capacity_factors.
+    p50_cost: list[list[float]]
+    p80_cost: list[list[float]]
+    p50_days: list[list[float]]
+    p80_days: list[list[float]]
+
+
+class PortfolioScenarioResult(BaseModel):
+    projects: list[ScenarioResult]
+    p50_cost: float
+    p80_cost: float
+    iterations: int
 
 
 class RecommendationRead(BaseModel):
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.adapters.importers import JSON_BATCH_ROWS, import_projects_from_json
+from app.db.database import Base
+from app.models.models import Client
+
+
+def write_input(path: str, rows: int, fmt: str) -> None:
+    record = {
+        "client_id": 1,
+        "region": "Americas",
+        "sector": "Office",
+        "start_date": "2024-01-01",
+        "end_date": "2024-12-31",
+        "baseline_budget": 1200000,
+        "current_forecast": 1300000,
+        "actual_spend": 500000,
+        "baseline_schedule_days": 365,
+        "forecast_schedule_days": 380,
+        "percent_complete": 0.45,
+        "safety_incidents": 1,
+        "status": "active",
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        if fmt == "array":
+            handle.write("[\n")
+        for index in range(rows):
+            record["actual_spend"] = 500000 + index
+            separator = ",\n" if fmt == "array" and index < rows - 1 else "\n"
+            handle.write(json.dumps(record) + separator)
+        if fmt == "array":
+            handle.write("]\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark streaming JSON/NDJSON project import.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("array", "ndjson"), default="ndjson")
+    parser.add_argument("--batch-size", type=int, default=JSON_BATCH_ROWS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, f"projects.{args.format}")
+        write_input(source, args.rows, args.format)
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            db.add(Client(id=1, name="Benchmark"))
+            db.commit()
+            baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            started = time.perf_counter()
+            with open(source, "rb") as handle:
+                result = import_projects_from_json(handle, db, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        f"format={args.format} rows={result.imported} failed={result.failed} "
+        f"time={elapsed:.1f}s rows_per_sec={result.imported / elapsed:,.0f} "
+        f"peak_rss_mb={peak_rss / 1024:.0f} (before import {baseline_rss / 1024:.0f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
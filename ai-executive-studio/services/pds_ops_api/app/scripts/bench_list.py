@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, FastAPI, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.dependencies import auth_guard, get_db
+from app.api.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    PageParams,
+    page_params,
+    paginate,
+)
+from app.api.routes import PROJECT_SORTS, router
+from app.db.migrations import migrate
+from app.models.models import Client, Project
+from app.schemas.schemas import ProjectRead
+
+
+def seed(engine, rows: int) -> None:
+    with Session(engine) as db:
+        db.add(Client(id=1, name="Benchmark"))
+        db.execute(
+            insert(Project),
+            [
+                {
+                    "client_id": 1,
+                    "region": ("NA", "EMEA", "APAC")[index % 3],
+                    "sector": "Office",
+                    "start_date": date(2024, 1, 1),
+                    "end_date": date(2024, 12, 31),
+                    "baseline_budget": 1_200_000.0,
+                    "current_forecast": 1_300_000.0 + index,
+                    "actual_spend": 500_000.0,
+                    "baseline_schedule_days": 365,
+                    "forecast_schedule_days": 380,
+                    "percent_complete": 0.45,
+                    "safety_incidents": index % 2,
+                    "status": "active",
+                    "last_updated": datetime(2024, 6, 1, 12, 0, 0),
+                }
+                for index in range(rows)
+            ],
+        )
+        db.commit()
+
+
+def build_app(engine) -> FastAPI:
+    sessions = sessionmaker(bind=engine)
+
+    def db_override():
+        with sessions() as db:
+            yield db
+
+    # The list route as it was before the JSON fast path: ORM rows through response_model.
+    before = APIRouter()
+
+    @before.get("/bench/projects-orm", response_model=list[ProjectRead])
+    def list_projects_orm(
+        response: Response,
+        page: PageParams = Depends(page_params),
+        db: Session = Depends(get_db),
+        user=Depends(auth_guard),
+    ):
+        return paginate(db.query(Project), Project, page, response, PROJECT_SORTS)
+
+    app = FastAPI()
+    app.include_router(router)
+    app.include_router(before)
+    app.dependency_overrides[get_db] = db_override
+    return app
+
+
+def fetch_all(client: TestClient, path: str) -> tuple[int, float]:
+    rows, cursor = 0, None
+    started = time.perf_counter()
+    while True:
+        params = {"limit": MAX_PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params)
+        response.raise_for_status()
+        rows += len(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return rows, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark paging through every project.")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        migrate(engine)
+        seed(engine, args.rows)
+        with TestClient(build_app(engine)) as client:
+            client.auth = ("admin", "admin")
+            for label, path in (
+                ("orm+response_model", "/bench/projects-orm"),
+                ("json", "/projects"),
+            ):
+                runs = [fetch_all(client, path) for _ in range(args.repeat)]
+                rows, best = runs[0][0], min(elapsed for _, elapsed in runs)
+                print(
+                    f"{label:<20} rows={rows} pages={-(-rows // MAX_PAGE_SIZE)} "
+                    f"best_of_{args.repeat}={best:.2f}s rows_per_sec={rows / best:,.0f}"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
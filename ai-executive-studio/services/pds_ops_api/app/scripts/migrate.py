@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from app.db.database import engine
+from app.db.migrations import MIGRATIONS, current_version, migrate
+
+
+def main() -> None:
+    applied = migrate(engine)
+    with engine.connect() as conn:
+        version = current_version(conn)
+    for item in MIGRATIONS:
+        if item.version in applied:
+            print(f"applied {item.version}: {item.description}")
+    print(f"schema version {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import argparse
+from datetime import date
+
+from app.db.database import SessionLocal, engine
+from app.db.migrations import migrate
+from app.engine.history import backfill_kpi_snapshots
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Write daily per-project KPI snapshots (nightly, or --start to backfill)."
+    )
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--end", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+    end = args.end or date.today()
+    start = args.start or end
+
+    migrate(engine)
+    with SessionLocal() as db:
+        written = backfill_kpi_snapshots(db, start, end)
+    print(f"wrote {written} KPI snapshots for {start}..{end}")
+
+
+if __name__ == "__main__":
+    main()
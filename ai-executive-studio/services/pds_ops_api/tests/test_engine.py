@@ -1,7 +1,51 @@
+import json
+import random
 from datetime import date
 
-from app.engine.analytics import calculate_kpi, monte_carlo, portfolio_ranking
-from app.models.models import Project, RiskItem, Client
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, inspect, select, text
+
+from app.api.routes import _load_scenario_inputs, analytics_portfolio_ranking
+from app.db import database, events
+from app.db.database import Base
+from app.db.migrations import MIGRATIONS, current_version, migrate
+from app.engine.analytics import (
+    calculate_kpi,
+    calculate_kpis,
+    monte_carlo,
+    monte_carlo_portfolio,
+    portfolio_ranking,
+    rank_snapshot,
+    scenario_sweep,
+)
+from app.engine.brief import BriefStore, brief_store
+from app.engine.cache import ScenarioCache, scenario_cache
+from app.engine.correlation import CorrelationModel, build_copula
+from app.engine.history import backfill_kpi_snapshots, kpi_history
+from app.engine.parallel import ScenarioExecutor, portfolio_plan, project_plan
+from app.engine.ranking import RankingIndex
+from app.engine.recommendations import (
+    Recommendation,
+    generate_recommendations,
+    recommend_from_snapshot,
+    recommendation_rules,
+)
+from app.engine.rules import Rule
+from app.engine.snapshot import PortfolioSnapshot, SnapshotStore, portfolio_snapshot
+from app.models.models import (
+    Client,
+    Decision,
+    KPISnapshot,
+    Outcome,
+    ProcessTemplate,
+    Project,
+    RiskItem,
+    RuleFeedback,
+)
+from app.schemas.schemas import ScenarioSweepRequest
 
 
 def make_project():
@@ -33,6 +77,52 @@ def test_kpi_calculation():
     assert round(kpi.cv, 2) == 0.0
 
 
+def test_calculate_kpis_matches_scalar_formula_on_random_portfolios():
+    rng = random.Random(3)
+    as_of = date(2024, 7, 15)
+    projects = []
+    for i in range(200):
+        project = make_project()
+        project.id = i
+        project.start_date = date.fromordinal(date(2023, 1, 1).toordinal() + rng.randint(0, 700))
+        project.end_date = date.fromordinal(project.start_date.toordinal() + rng.randint(-5, 400))
+        project.baseline_schedule_days = rng.choice([0, rng.randint(1, 500)])
+        project.percent_complete = rng.choice([0.0, rng.random(), rng.uniform(1, 100)])
+        project.baseline_budget = rng.uniform(0, 1e6)
+        project.actual_spend = rng.choice([0.0, rng.uniform(0, 1e6)])
+        projects.append(project)
+
+    frame = pd.DataFrame(
+        {
+            "project_id": [p.id for p in projects],
+            "percent_complete": [p.percent_complete for p in projects],
+            "baseline_budget": [p.baseline_budget for p in projects],
+            "actual_spend": [p.actual_spend for p in projects],
+            "start_date": pd.to_datetime([p.start_date for p in projects]),
+            "end_date": [p.end_date for p in projects],
+            "baseline_schedule_days": [p.baseline_schedule_days for p in projects],
+        }
+    )
+    kpis = calculate_kpis(frame, as_of)
+    for index, project in enumerate(projects):
+        percent = project.percent_complete
+        percent = percent / 100 if percent > 1 else percent
+        ev = percent * project.baseline_budget
+        span = (project.end_date - project.start_date).days
+        duration = project.baseline_schedule_days or max(span, 1)
+        pv = (as_of - project.start_date).days / duration * project.baseline_budget
+        expected = {
+            "ev": ev,
+            "pv": pv,
+            "cv": ev - project.actual_spend,
+            "sv": ev - pv,
+            "cpi": ev / project.actual_spend if project.actual_spend else 0.0,
+            "spi": ev / pv if pv else 0.0,
+        }
+        assert {name: kpis[name][index] for name in expected} == expected
+        assert calculate_kpi(project, as_of).spi == expected["spi"]
+
+
 def test_monte_carlo():
     project = make_project()
     risks = [RiskItem(project_id=1, category="cost", probability=1.0, impact_cost=100, impact_days=10)]
@@ -41,7 +131,1166 @@ def test_monte_carlo():
     assert output["p80_cost"] >= output["p50_cost"]
 
 
+def test_monte_carlo_seed_is_reproducible_and_local():
+    project = make_project()
+    risks = [
+        RiskItem(project_id=1, category="cost", probability=0.3, impact_cost=100, impact_days=10),
+        RiskItem(
+            project_id=1, category="schedule", probability=0.6, impact_cost=50, impact_days=20
+        ),
+    ]
+    random.seed(7)
+    expected = random.random()
+    random.seed(7)
+    first = monte_carlo(project, risks, iterations=5000, seed=42)
+    assert random.random() == expected
+    assert monte_carlo(project, risks, iterations=5000, seed=42) == first
+    assert first["p50_days"] <= first["p80_days"]
+
+
+def test_streaming_percentiles_stay_within_error_bounds():
+    project = make_project()
+    risks = [
+        RiskItem(
+            project_id=1,
+            category="cost",
+            probability=0.1 * i,
+            impact_cost=37.5 * i,
+            impact_days=1.5 * i,
+        )
+        for i in range(1, 10)
+    ]
+    requested = (10, 50, 80, 95)
+    exact = monte_carlo(project, risks, iterations=20000, seed=9, percentiles=requested)
+    streamed = monte_carlo(
+        project, risks, iterations=20000, seed=9, percentiles=requested, streaming=True, bins=64
+    )
+    for percentile in requested:
+        for name in ("cost", "days"):
+            key = f"p{percentile}_{name}"
+            assert abs(streamed[key] - exact[key]) <= streamed["error_bounds"][key]
+
+    plan = project_plan(
+        project, risks, iterations=20000, seed=9, streaming=True, bins=64, shard_size=45000
+    )
+    assert len(plan.shards) == 4
+    executor = ScenarioExecutor(max_workers=1)
+    merged = executor.run(plan)
+    exact = executor.run(project_plan(project, risks, iterations=20000, seed=9, shard_size=45000))
+    assert abs(merged["p80_cost"] - exact["p80_cost"]) <= merged["error_bounds"]["p80_cost"]
+
+
+def test_monte_carlo_stops_once_percentiles_converge():
+    project = make_project()
+    certain = [
+        RiskItem(project_id=1, category="cost", probability=1.0, impact_cost=100, impact_days=10)
+    ]
+    output = monte_carlo(project, certain, iterations=200, seed=1, tolerance=0.001)
+    assert output["iterations"] == 200
+    assert output["convergence"]["converged"]
+    assert output["convergence"]["intervals"]["p80_cost"] == (1200.0, 1200.0)
+
+    noisy = [
+        RiskItem(project_id=1, category="cost", probability=0.5, impact_cost=100 * i, impact_days=i)
+        for i in range(1, 30)
+    ]
+    output = monte_carlo(
+        project, noisy, iterations=200, seed=1, sampler="lhs", tolerance=1e-9, max_iterations=1000
+    )
+    assert output["iterations"] == 1000
+    assert not output["convergence"]["converged"]
+    low, high = output["convergence"]["intervals"]["p50_cost"]
+    assert low <= output["p50_cost"] <= high
+
+    # P50 is 0 when nothing is forecast and the only risk hits half the time; the tolerance is
+    # then measured against the mean outcome (50) instead of demanding a zero-width interval.
+    empty = make_project()
+    empty.current_forecast, empty.forecast_schedule_days = 0, 0
+    # A coin-flip risk on a zero base: P50 sits at 0 while the interval spans 0..100.
+    coin = [
+        RiskItem(project_id=1, category="cost", probability=0.5, impact_cost=100, impact_days=10)
+    ]
+    output = monte_carlo(empty, coin, iterations=200, seed=6, tolerance=2.5, max_iterations=3_000)
+    assert output["convergence"]["converged"]
+    assert output["iterations"] < 3_000
+
+
+def test_scenario_sweep_shares_draws_with_monte_carlo():
+    project = make_project()
+    risks = [
+        RiskItem(
+            project_id=1,
+            category="cost",
+            probability=0.2 + 0.1 * i,
+            impact_cost=50 * i,
+            impact_days=i,
+        )
+        for i in range(1, 6)
+    ]
+    grid = scenario_sweep(
+        project,
+        risks,
+        inflation_factors=[1.0, 1.2],
+        staffing_capacity_factors=[0.5, 1.0, 2.0],
+        risk_mitigation_effectiveness=[0.5, 1.0],
+        iterations=2000,
+        seed=5,
+    )
+    assert len(grid["p80_cost"]) == 2 and len(grid["p80_cost"][0]) == 2
+    assert len(grid["p80_days"][0]) == 3
+    for m, mitigation in enumerate([0.5, 1.0]):
+        for i, inflation in enumerate([1.0, 1.2]):
+            single = monte_carlo(
+                project,
+                risks,
+                iterations=2000,
+                seed=5,
+                inflation_factor=inflation,
+                risk_mitigation_effectiveness=mitigation,
+            )
+            assert abs(grid["p80_cost"][m][i] - single["p80_cost"]) < 1e-6
+    assert grid["p80_days"][1][0] >= grid["p80_days"][1][1] >= grid["p80_days"][1][2]
+    with pytest.raises(ValidationError):
+        ScenarioSweepRequest(project_id=1, iterations=2_000_000)
+
+
+def test_correlated_risks_fatten_the_tail_but_keep_marginals():
+    projects = [make_project() for _ in range(6)]
+    for index, project in enumerate(projects, start=1):
+        project.id = index
+    risks = [
+        RiskItem(
+            project_id=project.id,
+            category="schedule",
+            probability=0.2,
+            impact_cost=100,
+            impact_days=5,
+        )
+        for project in projects
+        for _ in range(5)
+    ]
+    independent = monte_carlo_portfolio(projects, risks, iterations=20000, seed=4)
+    correlated = monte_carlo_portfolio(
+        projects,
+        risks,
+        iterations=20000,
+        seed=4,
+        correlation=CorrelationModel(category=0.5, region=0.3),
+    )
+    assert correlated["p80_cost"] > independent["p80_cost"]
+
+    copula = build_copula(
+        CorrelationModel(category=0.5, region=0.3),
+        np.full(3, 0.2),
+        ["schedule", "schedule", "cost"],
+        ["NA", "EU", "NA"],
+    )
+    latents = copula.latents(np.random.default_rng(4), 200000)
+    hit_rates = (latents <= copula.thresholds).mean(axis=0)
+    assert np.allclose(hit_rates, 0.2, atol=0.005)
+    expected = np.array([[1.0, 0.5, 0.3], [0.5, 1.0, 0.0], [0.3, 0.0, 1.0]])
+    assert np.allclose(np.corrcoef(latents, rowvar=False), expected, atol=0.01)
+
+
+def test_monte_carlo_portfolio_matches_certain_outcomes():
+    first = make_project()
+    second = make_project()
+    second.id = 2
+    empty = make_project()
+    empty.id = 3
+    risks = [
+        RiskItem(project_id=2, category="cost", probability=1.0, impact_cost=50, impact_days=5),
+        RiskItem(project_id=1, category="cost", probability=1.0, impact_cost=100, impact_days=10),
+        RiskItem(project_id=2, category="scope", probability=0.0, impact_cost=900, impact_days=90),
+    ]
+    output = monte_carlo_portfolio([first, empty, second], risks, iterations=200, seed=3)
+    by_id = {item["project_id"]: item for item in output["projects"]}
+    assert by_id[1]["p80_cost"] == 1200
+    assert by_id[2]["p80_cost"] == 1150
+    assert by_id[2]["p80_days"] == 385
+    assert by_id[3]["p50_cost"] == 1100
+    assert output["p50_cost"] == output["p80_cost"] == 3450
+
+
+def test_parallel_scenarios_do_not_depend_on_worker_count():
+    projects = [make_project() for _ in range(4)]
+    for index, project in enumerate(projects, start=1):
+        project.id = index
+    risks = [
+        RiskItem(
+            project_id=index % 4 + 1,
+            category="cost",
+            probability=0.3,
+            impact_cost=10 * index,
+            impact_days=index,
+        )
+        for index in range(12)
+    ]
+    serial, pooled = ScenarioExecutor(max_workers=1), ScenarioExecutor(max_workers=2)
+    try:
+        plan = portfolio_plan(projects, risks, iterations=500, seed=11, shard_size=1500)
+        assert len(plan.shards) > 1
+        assert serial.run(plan) == pooled.run(plan)
+        plan = project_plan(projects[0], risks[:3], iterations=5000, seed=11, shard_size=3000)
+        assert len(plan.shards) == 5
+        assert serial.run(plan) == pooled.run(plan)
+    finally:
+        pooled.shutdown()
+
+
+def test_scenario_cache_lru_ttl_and_invalidation_on_commit(db_session):
+    now = [0.0]
+    cache = ScenarioCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    project = make_project()
+    cache.set(cache.key(project, [], iterations=10), {"p50_cost": 1.0})
+    cache.set(cache.key(project, [], iterations=20), {"p50_cost": 2.0})
+    cache.set(cache.key(project, [], iterations=30), {"p50_cost": 3.0})
+    assert cache.get(cache.key(project, [], iterations=10)) is None
+    assert cache.get(cache.key(project, [], iterations=30)) == {"p50_cost": 3.0}
+    now[0] = 11.0
+    assert cache.get(cache.key(project, [], iterations=30)) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["evictions"] == 1
+    uncached = ScenarioCache(ttl_seconds=0, clock=lambda: now[0])
+    uncached.set(uncached.key(project, [], iterations=10), {"p50_cost": 1.0})
+    now[0] = 11.5
+    assert uncached.get(uncached.key(project, [], iterations=10)) is None
+
+    db_session.add(project)
+    risk = RiskItem(project_id=1, category="cost", probability=0.5, impact_cost=10, impact_days=1)
+    db_session.add(risk)
+    db_session.commit()
+    key = scenario_cache.key(project, [risk], iterations=10)
+    scenario_cache.set(key, {"p50_cost": 1.0})
+    risk.probability = 0.9
+    db_session.commit()
+    assert scenario_cache.get(key) is None
+    assert scenario_cache.key(project, [risk], iterations=10) != key
+
+
 def test_portfolio_ranking():
     project = make_project()
     ranking = portfolio_ranking([project], [])
     assert ranking[0]["project_id"] == project.id
+
+
+def test_portfolio_snapshot_matches_orm_and_refreshes_on_commit(db_session):
+    clients = [
+        Client(
+            id=i,
+            name=f"Client {i}",
+            strategic_priority=i,
+            satisfaction_score=i,
+            pipeline_value=1000 * i,
+        )
+        for i in range(1, 6)
+    ]
+    projects = []
+    for i in range(1, 21):
+        project = make_project()
+        project.id, project.client_id, project.client = i, clients[i % 5].id, clients[i % 5]
+        project.percent_complete = 5.0 * i
+        project.actual_spend = 30.0 * i
+        projects.append(project)
+    risks = [
+        RiskItem(project_id=1 + i % 20, category=("schedule", "scope")[i % 2], probability=0.05 * i,
+                 impact_cost=10 * i, impact_days=i)
+        for i in range(1, 16)
+    ]
+    db_session.add_all(clients + projects + risks)
+    db_session.commit()
+
+    store = SnapshotStore()
+    events.on_commit(store.invalidate)
+    try:
+        as_of = date(2024, 6, 1)
+        snapshot = store.get(db_session)
+        expected = rank_snapshot(type(snapshot).from_objects(projects, risks), as_of)
+        assert rank_snapshot(snapshot, as_of) == pytest.approx(expected)
+        assert rank_snapshot(snapshot) == portfolio_ranking(projects, risks)
+        assert [r.explanation for r in recommend_from_snapshot(snapshot, [], [])] == [
+            r.explanation for r in generate_recommendations(projects, risks, [], [])
+        ]
+        assert int(snapshot.high_risk_count.sum()) == len([r for r in risks if r.probability > 0.6])
+
+        risks[0].probability = 1.0
+        clients[2].strategic_priority = 9
+        db_session.commit()
+        refreshed = store.get(db_session)
+        assert store.full_loads == 1 and store.partial_loads == 1
+        assert rank_snapshot(refreshed, as_of) == pytest.approx(
+            rank_snapshot(type(snapshot).from_objects(projects, risks), as_of)
+        )
+    finally:
+        events._listeners.remove(store.invalidate)
+
+
+def test_stores_reload_after_writes_from_another_process(db_session):
+    project = make_project()
+    db_session.add(project)
+    db_session.commit()
+    # Neither store is registered with on_commit, so these commits look like another process's.
+    store, briefs = SnapshotStore(), BriefStore()
+    assert store.get(db_session).current_forecast.tolist() == [1100]
+    first = briefs.get(db_session)
+
+    project.current_forecast = 1500
+    db_session.add(RiskItem(project_id=1, category="cost", probability=0.9, impact_cost=10))
+    db_session.commit()
+    assert store.get(db_session).current_forecast.tolist() == [1500]
+    assert store.full_loads == 2
+    assert store.get(db_session) is store.get(db_session) and store.full_loads == 2
+    assert briefs.get(db_session).payload["metrics"]["high_risk"] == 1
+    assert briefs.stats()["generations"] == 2 and first.payload["metrics"]["high_risk"] == 0
+
+
+def test_snapshot_loads_long_id_lists_in_batches_and_retries_failed_refreshes(
+    db_session, monkeypatch
+):
+    from app.engine import snapshot as snapshot_module
+
+    projects = []
+    for i in range(1, 8):
+        project = make_project()
+        project.id, project.client = i, projects[0].client if projects else project.client
+        projects.append(project)
+    db_session.add_all(projects)
+    db_session.commit()
+    full = PortfolioSnapshot.load(db_session)
+    monkeypatch.setattr(snapshot_module, "MAX_IN_PARAMETERS", 2)
+    batched = PortfolioSnapshot.load(db_session, {7, 3, 1, 5, 2, 6, 4})
+    assert batched.project_ids.tolist() == full.project_ids.tolist()
+    assert batched.current_forecast.tolist() == full.current_forecast.tolist()
+
+    store = SnapshotStore()
+    events.on_commit(store.invalidate)
+    try:
+        store.get(db_session)
+        projects[2].current_forecast = 2000
+        db_session.commit()
+        load = PortfolioSnapshot.load
+
+        def failing_load(db, project_ids=None):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(PortfolioSnapshot, "load", failing_load)
+        with pytest.raises(RuntimeError):
+            store.get(db_session)
+        monkeypatch.setattr(PortfolioSnapshot, "load", load)
+        assert store.get(db_session).current_forecast[2] == 2000
+    finally:
+        events._listeners.remove(store.invalidate)
+
+
+def test_portfolio_queries_do_not_grow_with_portfolio_size(db_session, query_counter):
+    def add_projects(first, count):
+        for i in range(first, first + count):
+            client = Client(id=i, name=f"Client {i}", strategic_priority=1 + i % 5)
+            project = make_project()
+            project.id, project.client_id, project.client = i, i, client
+            risk = RiskItem(project_id=i, category="cost", probability=0.5, impact_cost=10)
+            db_session.add_all([client, project, risk])
+        db_session.commit()
+        db_session.expunge_all()
+
+    counts = []
+    for first, count in ((1, 5), (6, 45)):
+        add_projects(first, count)
+        portfolio_snapshot.clear()
+        query_counter.clear()
+        ranking = analytics_portfolio_ranking(
+            limit=None, offset=0, region=None, sector=None, db=db_session, user=None
+        )["ranking"]
+        inputs = _load_scenario_inputs(db_session, None)
+        assert len(ranking) == len(inputs) == first + count - 1
+        counts.append(len(query_counter))
+    assert counts[0] == counts[1] == 5
+
+
+def test_ranking_index_updates_incrementally_and_matches_full_recompute(db_session):
+    clients = [Client(id=i, name=f"Client {i}", strategic_priority=i) for i in range(1, 4)]
+    projects = []
+    for i in range(1, 31):
+        project = make_project()
+        project.id, project.client = i, clients[i % 3]
+        project.region, project.sector = ("NA", "EU")[i % 2], ("Office", "Lab", "Retail")[i % 3]
+        project.actual_spend = 25.0 * i
+        projects.append(project)
+    db_session.add_all(clients + projects)
+    db_session.commit()
+
+    store = SnapshotStore()
+    index = RankingIndex(store)
+    events.on_commit(store.invalidate)
+    try:
+        as_of = date(2024, 6, 1)
+
+        def expected(region=None, sector=None):
+            ranking = rank_snapshot(PortfolioSnapshot.load(db_session), as_of)
+            return [
+                row for row in ranking
+                if region in (None, projects[row["project_id"] - 1].region)
+                and sector in (None, projects[row["project_id"] - 1].sector)
+            ]
+
+        page, total = index.top(db_session, limit=5, offset=2, as_of=as_of)
+        assert total == 30 and page == expected()[2:7]
+
+        db_session.add(RiskItem(project_id=7, category="cost", probability=0.9, impact_cost=5000))
+        clients[1].strategic_priority = 9
+        db_session.delete(projects[29])
+        db_session.commit()
+        for region, sector in ((None, None), ("EU", None), (None, "Lab"), ("NA", "Retail")):
+            page, total = index.top(db_session, limit=4, region=region, sector=sector, as_of=as_of)
+            full = expected(region, sector)
+            assert total == len(full) and page == full[:4]
+        assert index.rebuilds == 1 and index.updates == 1
+    finally:
+        events._listeners.remove(store.invalidate)
+
+
+def test_recommendation_rules_keep_existing_output_and_order():
+    slipping = make_project()
+    slipping.actual_spend = 800
+    healthy = make_project()
+    healthy.id, healthy.percent_complete = 2, 0.9
+    risks = [
+        RiskItem(project_id=2, category="schedule", probability=0.2, impact_cost=10, impact_days=1)
+        for _ in range(3)
+    ]
+    template = ProcessTemplate(id=7, name="Lookahead")
+    feedback = [RuleFeedback(rule_key="cost_overrun", success_rate=0.8)]
+
+    snapshot = PortfolioSnapshot.from_objects([slipping, healthy], risks)
+    output = recommend_from_snapshot(snapshot, [template], feedback, as_of=date(2024, 12, 1))
+    assert output == [
+        Recommendation(
+            decision_type="escalate",
+            affected_project_ids=[1],
+            expected_impact={"schedule_recovery_days": 10, "resource_shift": "increase"},
+            explanation=(
+                "SPI 0.44 below 0.90 with client priority 5; "
+                "recommend escalation and resource reallocation."
+            ),
+            confidence=0.5,
+            rule_key="schedule_slip_priority",
+        ),
+        Recommendation(
+            decision_type="risk_mitigation",
+            affected_project_ids=[1],
+            expected_impact={"cost_control": True, "target_cpi": 0.95},
+            explanation="CPI 0.50 below 0.90; recommend cost controls and risk mitigation actions.",
+            confidence=0.8,
+            rule_key="cost_overrun",
+        ),
+        Recommendation(
+            decision_type="standardize_process",
+            affected_project_ids=[1, 2],
+            expected_impact={"template_id": 7, "adoption_target": 0.75},
+            explanation=(
+                "Schedule risks recurring across portfolio; recommend standardizing process "
+                "using template 'Lookahead'."
+            ),
+            confidence=0.5,
+            rule_key="standardize_schedule_controls",
+        ),
+    ]
+    with pytest.raises(ValueError):
+        recommendation_rules.register(
+            Rule(
+                key="cost_overrun",
+                decision_type="x",
+                predicate=lambda c: True,
+                impact={},
+                explanation="",
+            )
+        )
+
+
+def test_kpi_history_backfill_and_on_write_snapshots(db_session, monkeypatch):
+
+    monkeypatch.setattr(database, "MAX_IN_PARAMETERS", 1)  # one project per statement
+    first, second = make_project(), make_project()
+    second.id, second.client, second.client_id, second.actual_spend = 2, first.client, 1, 600
+    db_session.add_all([first, second])
+    db_session.commit()
+    today = date.today()
+    assert [(row.project_id, row.as_of) for row in kpi_history(db_session, today, today)] == [
+        (1, today),
+        (2, today),
+    ]
+
+    assert backfill_kpi_snapshots(db_session, date(2024, 3, 1), date(2024, 3, 3)) == 6
+    series = kpi_history(db_session, date(2024, 3, 2), date(2024, 3, 3), project_id=2)
+    assert [row.as_of for row in series] == [date(2024, 3, 2), date(2024, 3, 3)]
+    expected = calculate_kpi(second, as_of=date(2024, 3, 3))
+    assert (series[-1].pv, series[-1].spi, series[-1].ac) == (expected.pv, expected.spi, 600)
+
+    second.actual_spend = 900
+    db_session.commit()
+    (latest,) = kpi_history(db_session, today, today, project_id=2)
+    assert latest.ac == 900 and latest.cv == calculate_kpi(second, as_of=today).cv
+
+    # A later backfill fills only missing days and leaves recorded history alone.
+    assert backfill_kpi_snapshots(db_session, date(2024, 3, 3), date(2024, 3, 4)) == 2
+    series = kpi_history(db_session, date(2024, 3, 3), date(2024, 3, 4), project_id=2)
+    assert [row.ac for row in series] == [600, 900]
+
+
+def test_delete_project_removes_its_kpi_snapshots(db_session, api_client):
+    db_session.execute(text("PRAGMA foreign_keys=ON"))
+    db_session.add(make_project())
+    db_session.commit()
+    assert kpi_history(db_session, date.today(), date.today(), project_id=1)
+
+    assert api_client.delete("/projects/1").status_code == 200
+    assert db_session.query(KPISnapshot).count() == 0
+
+
+def test_executive_brief_is_materialized_with_etag_and_debounced_refresh(db_session, api_client):
+    db_session.add(make_project())
+    db_session.commit()
+
+    first = api_client.get("/reports/executive-brief")
+    etag = first.headers["etag"]
+    assert first.json()["metrics"] == {"total_projects": 1, "high_risk": 0}
+    revalidated = api_client.get("/reports/executive-brief", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+
+    store = BriefStore(debounce_seconds=0.05)
+    events.on_commit(store.invalidate)
+    try:
+        store.get(db_session)
+        for probability in (0.7, 0.8, 0.9):
+            risk = RiskItem(project_id=1, category="cost", probability=probability, impact_cost=1)
+            db_session.add(risk)
+            db_session.commit()
+        assert store.stats()["stale"] and store.get(db_session).payload["metrics"]["high_risk"] == 0
+        store.wait()
+        stats = store.stats()
+        assert stats["generations"] == 2 and stats["version"] == 2 and not stats["stale"]
+        assert store.get(db_session).payload["metrics"]["high_risk"] == 3
+        assert stats["last_staleness_seconds"] >= 0.05
+    finally:
+        events._listeners.remove(store.invalidate)
+        store.clear()
+        brief_store.clear()
+
+
+def test_csv_import_streams_chunks_and_reports_row_errors(db_session, api_client):
+    db_session.add(Client(id=1, name="Client"))
+    db_session.commit()
+    header = (
+        "client_id,region,sector,start_date,end_date,baseline_budget,current_forecast,actual_spend,"
+        "baseline_schedule_days,forecast_schedule_days,percent_complete,safety_incidents,status\n"
+    )
+    good = "1,NA,Office,2024-01-01,2024-12-31,1000,1100,400,365,380,0.4,0,\n"
+    bad = [
+        "2,NA,Office,2024-01-01,2024-12-31,1000,1100,400,365,380,0.4,0,active\n",
+        "1,EU,Lab,not a date,2024-12-31,1000,1100,400,365,380,0.4,0,active\n",
+        "1,EU,Lab,2024-01-01,2024-12-31,1000,1100,400,36.5,380,0.4,0,active\n",
+    ]
+    content = header + good * 4 + "".join(bad) + good * 3
+
+    portfolio_snapshot.clear()
+    assert len(portfolio_snapshot.get(db_session)) == 0
+    response = api_client.post("/projects/import", files={"file": ("projects.csv", content)})
+    assert response.status_code == 200
+    assert response.json() == {
+        "imported": 7,
+        "inserted": 7,
+        "updated": 0,
+        "unchanged": 0,
+        "failed": 3,
+        "errors": [
+            {"row": 5, "error": "client_id 2 does not exist"},
+            {"row": 6, "error": "start_date is not a valid date"},
+            {"row": 7, "error": "baseline_schedule_days must be an integer"},
+        ],
+    }
+    projects = db_session.query(Project).all()
+    assert len(projects) == 7 and projects[0].status == "active"
+    assert projects[0].start_date == date(2024, 1, 1) and projects[0].region == "NA"
+    assert len(portfolio_snapshot.get(db_session)) == 7
+
+    files = {"file": ("projects.csv", "client_id\n1\n")}
+    missing = api_client.post("/projects/import", files=files)
+    assert missing.status_code == 400
+
+
+def test_json_import_accepts_arrays_and_ndjson_in_batches(db_session, api_client):
+    db_session.add(Client(id=1, name="Client"))
+    db_session.commit()
+    record = {
+        "client_id": 1, "region": "NA", "sector": "Office", "start_date": "2024-01-01",
+        "end_date": "2024-12-31", "baseline_budget": 1000, "current_forecast": 1100,
+        "actual_spend": 400, "baseline_schedule_days": 365, "forecast_schedule_days": 380,
+        "percent_complete": 0.4, "safety_incidents": 0,
+    }
+    lines = [json.dumps(record)] * 3 + ["{not json", json.dumps({**record, "client_id": 5})]
+    lines += [json.dumps({key: value for key, value in record.items() if key != "region"})]
+    lines += [json.dumps({**record, "start_date": "01/02/2024"})]
+    ndjson = "\n".join(lines) + "\n"
+    response = api_client.post(
+        "/projects/import-json?batch_size=2", files={"file": ("projects.ndjson", ndjson)}
+    )
+    assert response.json() == {
+        "imported": 4,
+        "inserted": 4,
+        "updated": 0,
+        "unchanged": 0,
+        "failed": 3,
+        "errors": [
+            {"row": 4, "error": "invalid JSON: Expecting property name enclosed in double quotes"},
+            {"row": 5, "error": "client_id 5 does not exist"},
+            {"row": 6, "error": "region is required"},
+        ],
+    }
+    assert db_session.query(Project).order_by(Project.id).all()[-1].start_date == date(2024, 1, 2)
+
+    array = json.dumps([record] * 5)
+    response = api_client.post("/projects/import-json", files={"file": ("projects.json", array)})
+    assert response.json()["imported"] == 5 and db_session.query(Project).count() == 9
+    # Cut off inside the fourth record: the first batch is committed before the error is hit.
+    cut = array[: len(json.dumps([record] * 3)) + 10]
+    truncated = api_client.post(
+        "/projects/import-json?batch_size=2", files={"file": ("projects.json", cut)}
+    )
+    assert truncated.status_code == 200
+    summary = truncated.json()
+    assert (summary["imported"], summary["failed"]) == (3, 1)
+    assert summary["errors"][0]["row"] == 4
+    assert summary["errors"][0]["error"].startswith("Invalid JSON array")
+    assert db_session.query(Project).count() == 12
+
+
+def test_upsert_import_skips_unchanged_rows_and_updates_changed_ones(
+    db_session, api_client, monkeypatch
+):
+    monkeypatch.setattr(database, "MAX_IN_PARAMETERS", 2)  # external ids looked up in batches
+    db_session.add(Client(id=1, name="Client"))
+    db_session.commit()
+    header = (
+        "external_id,client_id,region,sector,start_date,end_date,baseline_budget,current_forecast,"
+        "actual_spend,baseline_schedule_days,forecast_schedule_days,percent_complete,"
+        "safety_incidents\n"
+    )
+    row = "{},1,NA,Office,2024-01-01,2024-12-31,1000,1100,400,365,380,0.4,0\n"
+    rows = [row.format(f"P-{index}") for index in range(3)]
+
+    def upload(content: str, mode: str = "upsert") -> dict:
+        files = {"file": ("projects.csv", header + content)}
+        return api_client.post(f"/projects/import?mode={mode}", files=files).json()
+
+    assert upload("".join(rows))["inserted"] == 3
+    portfolio_snapshot.clear()
+    portfolio_snapshot.get(db_session)
+    partial_loads = portfolio_snapshot.partial_loads
+
+    again = upload("".join(rows))
+    assert (again["inserted"], again["updated"], again["unchanged"]) == (0, 0, 3)
+    portfolio_snapshot.get(db_session)
+    assert portfolio_snapshot.partial_loads == partial_loads
+
+    changed = rows[:2] + [rows[2].replace(",400,", ",900,"), rows[0].replace("P-0", "")]
+    result = upload("".join(changed))
+    assert (result["inserted"], result["updated"], result["unchanged"]) == (0, 1, 2)
+    assert result["errors"] == [{"row": 4, "error": "external_id is required for upsert"}]
+    assert db_session.query(Project).filter_by(external_id="P-2").one().actual_spend == 900
+    assert portfolio_snapshot.get(db_session).actual_spend.tolist() == [400, 400, 900]
+    assert portfolio_snapshot.partial_loads == partial_loads + 1
+
+    duplicate = upload(rows[0], mode="insert")
+    assert duplicate["errors"] == [{"row": 1, "error": "external_id P-0 already exists"}]
+    # The unique index only covers projects that have an external id.
+    anonymous = row.format("")
+    assert upload(anonymous + anonymous, mode="insert")["inserted"] == 2
+    db_session.query(Project).filter(Project.external_id.is_(None)).delete()
+    db_session.commit()
+
+    record = {
+        "external_id": "P-1", "client_id": 1, "region": "NA", "sector": "Office",
+        "start_date": "2024-01-01", "end_date": "2024-12-31", "baseline_budget": 1000,
+        "current_forecast": 1100, "actual_spend": 400, "baseline_schedule_days": 365,
+        "forecast_schedule_days": 380, "percent_complete": 0.4, "safety_incidents": 0,
+    }
+    ndjson = json.dumps(record) + "\n" + json.dumps({**record, "external_id": "P-3"}) + "\n"
+    response = api_client.post(
+        "/projects/import-json?mode=upsert", files={"file": ("projects.ndjson", ndjson)}
+    )
+    assert (response.json()["inserted"], response.json()["unchanged"]) == (1, 1)
+    assert db_session.query(Project).count() == 4
+
+
+def test_list_endpoints_page_with_keyset_cursor_filters_and_sort(db_session, api_client):
+    db_session.add(Client(id=1, name="Client"))
+    for index in range(7):
+        db_session.add(
+            Project(
+                client_id=1,
+                region="NA" if index % 3 else "EU",
+                sector="Office",
+                start_date=date(2024, 1 + index % 2, 1),
+                end_date=date(2024, 12, 31),
+                status="active",
+            )
+        )
+    db_session.commit()
+
+    def collect(params: str) -> list[int]:
+        ids, cursor = [], None
+        while True:
+            query = params + (f"&cursor={cursor}" if cursor else "")
+            response = api_client.get(f"/projects?limit=2&{query}")
+            assert response.status_code == 200 and len(response.json()) <= 2
+            ids += [project["id"] for project in response.json()]
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                return ids
+
+    assert collect("sort=id") == [1, 2, 3, 4, 5, 6, 7]
+    assert collect("sort=-id") == [7, 6, 5, 4, 3, 2, 1]
+    assert collect("region=NA&sort=start_date") == [3, 5, 2, 6]
+    assert collect("sort=-start_date") == [6, 4, 2, 7, 5, 3, 1]
+    assert "x-next-cursor" not in api_client.get("/projects").headers
+
+    cursor = api_client.get("/projects?limit=2&sort=start_date").headers["x-next-cursor"]
+    assert api_client.get(f"/projects?sort=-start_date&cursor={cursor}").status_code == 400
+    assert api_client.get("/projects?cursor=not-a-cursor").status_code == 400
+    assert api_client.get("/projects?sort=baseline_budget").status_code == 400
+
+
+def _schema(engine) -> dict:
+    inspector = inspect(engine)
+    return {
+        table: (
+            sorted(column["name"] for column in inspector.get_columns(table)),
+            sorted(
+                (index["name"], tuple(index["column_names"]), bool(index["unique"]))
+                for index in inspector.get_indexes(table)
+            ),
+        )
+        for table in Base.metadata.tables
+    }
+
+
+def test_migrations_bring_existing_databases_to_the_model_schema():
+    fresh = create_engine("sqlite://")
+    assert migrate(fresh) == [item.version for item in MIGRATIONS]
+
+    # A database created before KPI history, the import keys and secondary indexes existed.
+    legacy = create_engine("sqlite://")
+    Base.metadata.create_all(legacy)
+    with legacy.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE kpi_snapshots")
+        for table in inspect(conn).get_table_names():
+            for index in inspect(conn).get_indexes(table):
+                if index["name"] != f"ix_{table}_id":
+                    conn.exec_driver_sql(f"DROP INDEX {index['name']}")
+        conn.exec_driver_sql("ALTER TABLE projects DROP COLUMN external_id")
+        conn.exec_driver_sql("ALTER TABLE projects DROP COLUMN content_hash")
+
+    assert migrate(legacy) == [item.version for item in MIGRATIONS]
+    assert migrate(legacy) == []
+    with legacy.connect() as conn:
+        assert current_version(conn) == MIGRATIONS[-1].version
+    assert _schema(legacy) == _schema(fresh)
+    with legacy.connect() as conn:
+        sql = conn.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE name = 'ix_projects_external_id'"
+        ).scalar()
+    assert sql.endswith("WHERE external_id IS NOT NULL")
+
+
+def test_hot_queries_use_indexes():
+    engine = create_engine("sqlite://")
+    migrate(engine)
+    window = (date(2024, 1, 1), date(2024, 3, 31))
+    queries = [
+        select(RiskItem).where(RiskItem.project_id == 1),
+        select(RiskItem.project_id, RiskItem.category)
+        .where(RiskItem.project_id.in_([1, 2]))
+        .group_by(RiskItem.project_id, RiskItem.category),
+        select(Project).where(Project.client_id == 1),
+        select(Project.id).where(Project.external_id.in_(["P-1", "P-2"])),
+        select(Project)
+        .where(Project.region == "NA", Project.id > 100)
+        .order_by(Project.id)
+        .limit(101),
+        select(Project).where(Project.status == "active").order_by(Project.id).limit(101),
+        select(Project).order_by(Project.start_date.desc(), Project.id.desc()).limit(101),
+        select(Decision).where(Decision.decision_type == "cost_overrun"),
+        select(Outcome).where(Outcome.decision_id == 1),
+        select(RuleFeedback).where(RuleFeedback.rule_key == "cost_overrun"),
+        select(KPISnapshot).where(KPISnapshot.as_of.between(*window)),
+        select(KPISnapshot).where(KPISnapshot.project_id == 1, KPISnapshot.as_of.between(*window)),
+    ]
+    with engine.connect() as conn:
+        for query in queries:
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+            full_scans = [
+                step for step in plan
+                if (step.startswith("SCAN ") and "USING" not in step) or "FOR ORDER BY" in step
+            ]
+            assert not full_scans, (sql, plan)
+
+
+def test_async_reads_serve_more_concurrent_requests_than_the_threadpool(tmp_path):
+    pytest.importorskip("aiosqlite")
+    import asyncio
+    import time
+
+    import anyio
+    import httpx
+    from fastapi import FastAPI
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api.async_routes import with_async_reads
+    from app.api.dependencies import get_async_db, get_db
+    from app.api.routes import router
+
+    latency, requests, threads = 0.2, 16, 4
+    path = tmp_path / "load.db"
+    sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    migrate(sync_engine)
+    with sessionmaker(bind=sync_engine)() as db:
+        db.add(make_project())
+        db.commit()
+
+    def slow_selects(sql: str) -> None:
+        # Runs on the thread executing the statement, like waiting on a remote database.
+        if sql.startswith("SELECT"):
+            time.sleep(latency)
+
+    @event.listens_for(sync_engine, "connect")
+    def _sync_latency(dbapi_connection, record):
+        dbapi_connection.set_trace_callback(slow_selects)
+
+    sync_engine.dispose()  # pooled connections from the setup predate the trace callback
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=requests)
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _async_latency(dbapi_connection, record):
+        dbapi_connection.run_async(lambda connection: connection.set_trace_callback(slow_selects))
+
+    sync_sessions = sessionmaker(bind=sync_engine)
+    async_sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def sync_db():
+        with sync_sessions() as db:
+            yield db
+
+    async def async_db():
+        async with async_sessions() as db:
+            yield db
+
+    def build_app(api_router) -> FastAPI:
+        app = FastAPI()
+        app.include_router(api_router)
+        app.dependency_overrides[get_db] = sync_db
+        app.dependency_overrides[get_async_db] = async_db
+        return app
+
+    async def burst(app: FastAPI) -> float:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.perf_counter()
+            paths = ["/projects/1", "/projects?region=NA"] * (requests // 2)
+            responses = await asyncio.gather(
+                *(client.get(path, auth=("admin", "admin")) for path in paths)
+            )
+            elapsed = time.perf_counter() - started
+        assert all(response.status_code == 200 for response in responses)
+        assert responses[1].json()[0]["id"] == 1
+        return elapsed
+
+    async def timed_burst(app: FastAPI) -> float:
+        await burst(app)  # untimed warm-up opens the pooled connections
+        return await burst(app)
+
+    sync_elapsed = asyncio.run(timed_burst(build_app(router)))
+    async_elapsed = asyncio.run(timed_burst(build_app(with_async_reads(router))))
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
+
+    # The sync handlers queue for the threadpool slots; the async ones wait on the database.
+    assert sync_elapsed >= latency * requests / threads
+    assert async_elapsed < sync_elapsed / 2
+
+
+def test_readers_keep_reading_while_an_import_writes(tmp_path):
+    import threading
+    import time
+
+    from sqlalchemy import func
+    from sqlalchemy.orm import Session
+
+    from app.adapters.importers import import_projects_from_csv
+    from app.db.config import DatabaseConfig, create_database_engine, pool_stats
+
+    rows = 10_000
+    config = DatabaseConfig(
+        url=f"sqlite:///{tmp_path / 'wal.db'}", pool_size=2, max_overflow=0, pool_timeout=10
+    )
+    engine = create_database_engine(config)
+    migrate(engine)
+    with Session(engine) as db:
+        db.add(Client(id=1, name="Client"))
+        db.commit()
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+    header = (
+        "client_id,region,sector,start_date,end_date,baseline_budget,current_forecast,actual_spend,"
+        "baseline_schedule_days,forecast_schedule_days,percent_complete,safety_incidents\n"
+    )
+    content = header + "1,NA,Office,2024-01-01,2024-12-31,1000,1100,400,365,380,0.4,0\n" * rows
+    importing = threading.Event()
+    importing.set()
+    errors: list[Exception] = []
+    counts: list[int] = []
+    latencies: list[float] = []
+
+    def write() -> None:
+        try:
+            with Session(engine) as db:
+                assert import_projects_from_csv(content, db, chunk_size=1000).imported == rows
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            importing.clear()
+
+    def read() -> None:
+        while importing.is_set():
+            started = time.perf_counter()
+            try:
+                with Session(engine) as db:
+                    counts.append(db.scalar(select(func.count(Project.id))))
+            except Exception as exc:
+                errors.append(exc)
+                return
+            latencies.append(time.perf_counter() - started)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    # Readers only ever see whole chunks, committed one at a time.
+    assert len(counts) > 10 and all(count % 1000 == 0 and count <= rows for count in counts)
+    with Session(engine) as db:
+        assert db.scalar(select(func.count(Project.id))) == rows
+    assert max(latencies) < 2.0
+    stats = pool_stats(engine)
+    assert stats["checkouts"] >= len(counts) and stats["timeouts"] == 0
+    assert stats["size"] == 2 and stats["wait_seconds_max"] > 0
+    engine.dispose()
+
+
+def test_analytics_reads_use_the_replica_except_right_after_a_write(tmp_path, monkeypatch):
+    import sqlite3
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api import dependencies
+    from app.api.routes import router
+    from app.db.config import DatabaseConfig, create_database_engine
+
+    primary = create_database_engine(DatabaseConfig(url=f"sqlite:///{tmp_path / 'primary.db'}"))
+    replica = create_database_engine(DatabaseConfig(url=f"sqlite:///{tmp_path / 'replica.db'}"))
+    migrate(primary)
+    with sessionmaker(bind=primary)() as db:
+        db.add(make_project())
+        db.commit()
+
+    def replicate() -> None:
+        # Stand-in for replication: copy the primary's committed state onto the replica file.
+        with sqlite3.connect(tmp_path / "primary.db") as source:
+            with sqlite3.connect(tmp_path / "replica.db") as target:
+                source.backup(target)
+        replica.dispose()
+
+    replicate()
+    selects = {"primary": 0, "replica": 0}
+    for name, engine in (("primary", primary), ("replica", replica)):
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany, name=name):
+            selects[name] += statement.startswith("SELECT")
+
+    monkeypatch.setattr(dependencies, "SessionLocal", sessionmaker(bind=primary))
+    monkeypatch.setattr(dependencies, "ReadSessionLocal", sessionmaker(bind=replica))
+    app = FastAPI()
+    app.include_router(router)
+    writer, reader = TestClient(app), TestClient(app)
+    writer.auth = reader.auth = ("admin", "admin")
+
+    def scenario_projects(client: TestClient) -> list[int]:
+        response = client.get("/analytics/scenario", params={"iterations": 50, "seed": 1})
+        assert response.status_code == 200
+        return [item["project_id"] for item in response.json()]
+
+    assert scenario_projects(reader) == [1]
+    assert selects == {"primary": 0, "replica": 2}  # projects, then their risks
+
+    payload = {
+        "client_id": 1,
+        "region": "EU",
+        "sector": "Office",
+        "start_date": "2024-01-01",
+        "end_date": "2024-12-31",
+        "baseline_budget": 1000,
+        "current_forecast": 1000,
+        "actual_spend": 100,
+        "baseline_schedule_days": 100,
+        "forecast_schedule_days": 100,
+        "percent_complete": 0.1,
+        "safety_incidents": 0,
+        "status": "active",
+    }
+    created = writer.post("/projects", json=payload)
+    assert created.status_code == 200
+    assert dependencies.READ_PRIMARY_COOKIE in created.cookies
+    new_id = created.json()["id"]
+
+    # The writer reads its own write from the primary; other clients still see the replica.
+    assert scenario_projects(writer) == [1, new_id]
+    assert scenario_projects(reader) == [1]
+    replicate()
+    assert scenario_projects(reader) == [1, new_id]
+
+    writer.cookies.clear()
+    before = dict(selects)
+    assert scenario_projects(writer) == [1, new_id]
+    assert selects["primary"] == before["primary"]
+    primary.dispose()
+    replica.dispose()
+
+
+@pytest.mark.parametrize("backend_name", ["memory", "local-redis"])
+def test_response_cache_serves_etags_and_invalidates_per_table(
+    db_session, query_counter, monkeypatch, backend_name
+):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api.dependencies import get_db, get_read_db
+    from app.api.response_cache import (
+        LocalRedis,
+        MemoryBackend,
+        RedisBackend,
+        ResponseCache,
+        ResponseCacheMiddleware,
+        response_cache,
+    )
+    from app.api.routes import router
+
+    sessions = sessionmaker(bind=db_session.get_bind())
+    if backend_name == "memory":
+        backend = MemoryBackend(sessions=sessions)
+    else:
+        backend = RedisBackend(LocalRedis())
+    monkeypatch.setattr(response_cache, "backend", backend)
+    project, second = make_project(), make_project()
+    second.id, second.client = 2, project.client
+    db_session.add_all([project, second])
+    db_session.commit()
+
+    def build_client(cache: ResponseCache | None = None) -> TestClient:
+        app = FastAPI()
+        app.include_router(router)
+        app.add_middleware(ResponseCacheMiddleware, cache=cache)
+        app.dependency_overrides[get_db] = lambda: db_session
+        app.dependency_overrides[get_read_db] = lambda: db_session
+        client = TestClient(app)
+        client.auth = ("admin", "admin")
+        return client
+
+    client = build_client()
+    first = client.get("/projects", params={"limit": 1, "sort": "id"})
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+    query_counter.clear()
+    again = client.get("/projects?sort=id&limit=1")
+    # Served from the cache; the memory backend only reads the table versions.
+    assert all("data_versions" in statement for statement in query_counter)
+    assert len(query_counter) == (backend_name == "memory")
+    assert again.content == first.content and again.headers["etag"] == etag
+    assert again.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+
+    not_modified = client.get("/projects?limit=1&sort=id", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert client.get("/projects", params={"limit": 1}, auth=("admin", "wrong")).status_code == 401
+
+    # Writes to other tables leave the entry alone; a project write replaces it.
+    assert client.post("/clients", json={"name": "Other"}).status_code == 200
+    unchanged = client.get("/projects?limit=1&sort=id", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    # Another worker process: its own memory cache, which this process's commits never bump.
+    other_worker = build_client(ResponseCache(MemoryBackend(sessions=sessions)))
+    assert other_worker.get("/projects?limit=1&sort=id").json() == first.json()
+    closed = {**first.json()[0], "status": "closed"}
+    assert client.put("/projects/1", json=closed).status_code == 200
+    assert other_worker.get("/projects?limit=1&sort=id").json()[0]["status"] == "closed"
+    changed = client.get("/projects?limit=1&sort=id", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()[0]["status"] == "closed"
+    assert response_cache.stats()["backend"] == type(backend).__name__
+    assert ResponseCache(backend, ttl_seconds=0).ttl_seconds == 0
+
+
+def test_list_endpoints_serialize_rows_like_the_response_model(db_session, api_client):
+    from datetime import datetime
+
+    from pydantic import TypeAdapter
+
+    from app.schemas.schemas import DecisionRead, ProjectRead
+
+    project = make_project()
+    project.region, project.last_updated = "Région Nord", datetime(2024, 5, 1, 3, 4, 5, 123)
+    db_session.add(project)
+    db_session.add(
+        Decision(
+            decision_type="reallocate",
+            rationale="Budget",
+            expected_impact_json={"cost": -1.5},
+            related_project_ids=[1],
+            related_risk_ids=[],
+        )
+    )
+    db_session.commit()
+
+    # Byte-for-byte what the response_model path produced from ORM rows.
+    for path, model, schema in (
+        ("/projects", Project, ProjectRead),
+        ("/decisions", Decision, DecisionRead),
+    ):
+        response = api_client.get(path)
+        adapter = TypeAdapter(list[schema])
+        rows = db_session.query(model).order_by(model.id).all()
+        expected = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == expected
+
+
+def test_scenario_routes_reject_invalid_inputs(db_session, api_client):
+    db_session.add(make_project())
+    db_session.commit()
+    for query in ("iterations=0", "seed=-1"):
+        assert api_client.get(f"/analytics/scenario/portfolio?{query}").status_code == 400
+        assert api_client.get(f"/analytics/scenario?{query}").status_code == 400
+    for query in ("tolerance=0", "tolerance=-1"):
+        assert api_client.get(f"/analytics/scenario?{query}").status_code == 400
+    assert api_client.get("/analytics/scenario?max_iterations=2000000").status_code == 422
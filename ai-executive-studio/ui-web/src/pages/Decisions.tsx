@@ -1,13 +1,16 @@
 import { useEffect, useState } from 'react';
-import api from '../services/api';
+import api, { fetchPage } from '../services/api';
 import { Decision } from '../types';
 
 const Decisions = () => {
   const [decisions, setDecisions] = useState<Decision[]>([]);
   const [notes, setNotes] = useState<Record<number, string>>({});
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-  const fetchDecisions = () => {
-    api.get('/decisions').then((res) => setDecisions(res.data));
+  const fetchDecisions = async (cursor?: string) => {
+    const page = await fetchPage<Decision>('/decisions', { cursor });
+    setDecisions((prev) => (cursor ? [...prev, ...page.items] : page.items));
+    setNextCursor(page.nextCursor);
   };
 
   useEffect(() => {
@@ -67,6 +70,7 @@ const Decisions = () => {
           ))}
         </tbody>
       </table>
+      {nextCursor && <button onClick={() => fetchDecisions(nextCursor)}>Load more</button>}
     </div>
   );
 };
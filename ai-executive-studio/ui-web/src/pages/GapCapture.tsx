@@ -1,9 +1,10 @@
 import { useEffect, useState } from 'react';
-import api from '../services/api';
+import api, { fetchPage } from '../services/api';
 import { GapInput } from '../types';
 
 const GapCapture = () => {
   const [gaps, setGaps] = useState<GapInput[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [step, setStep] = useState(0);
   const [form, setForm] = useState({
     category: 'data_access',
@@ -42,8 +43,10 @@ const GapCapture = () => {
     policy: ''
   });
 
-  const fetchGaps = () => {
-    api.get('/gaps').then((res) => setGaps(res.data));
+  const fetchGaps = async (cursor?: string) => {
+    const page = await fetchPage<GapInput>('/gaps', { cursor });
+    setGaps((prev) => (cursor ? [...prev, ...page.items] : page.items));
+    setNextCursor(page.nextCursor);
   };
 
   useEffect(() => {
@@ -181,6 +184,7 @@ const GapCapture = () => {
             </li>
           ))}
         </ul>
+        {nextCursor && <button onClick={() => fetchGaps(nextCursor)}>Load more</button>}
       </section>
     </div>
   );
@@ -1,12 +1,19 @@
 import { useEffect, useState } from 'react';
-import api from '../services/api';
+import { fetchPage } from '../services/api';
 import { ProcessTemplate } from '../types';
 
 const ProcessTemplates = () => {
   const [templates, setTemplates] = useState<ProcessTemplate[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+
+  const fetchTemplates = async (cursor?: string) => {
+    const page = await fetchPage<ProcessTemplate>('/process-templates', { cursor });
+    setTemplates((prev) => (cursor ? [...prev, ...page.items] : page.items));
+    setNextCursor(page.nextCursor);
+  };
 
   useEffect(() => {
-    api.get('/process-templates').then((res) => setTemplates(res.data));
+    fetchTemplates();
   }, []);
 
   return (
@@ -30,6 +37,7 @@ const ProcessTemplates = () => {
           ))}
         </tbody>
       </table>
+      {nextCursor && <button onClick={() => fetchTemplates(nextCursor)}>Load more</button>}
     </div>
   );
 };
@@ -1,14 +1,21 @@
 import { useEffect, useState } from 'react';
-import api from '../services/api';
+import api, { fetchPage } from '../services/api';
 import { Project, ScenarioResult, KPIResult } from '../types';
 
 const Projects = () => {
   const [projects, setProjects] = useState<Project[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [scenario, setScenario] = useState<Record<number, ScenarioResult>>({});
   const [kpis, setKpis] = useState<Record<number, KPIResult>>({});
 
+  const loadProjects = async (cursor?: string) => {
+    const page = await fetchPage<Project>('/projects', { cursor });
+    setProjects((prev) => (cursor ? [...prev, ...page.items] : page.items));
+    setNextCursor(page.nextCursor);
+  };
+
   useEffect(() => {
-    api.get('/projects').then((res) => setProjects(res.data));
+    loadProjects();
     api.get('/analytics/kpis').then((res) => {
       const map: Record<number, KPIResult> = {};
       res.data.kpis.forEach((kpi: KPIResult) => {
@@ -75,6 +82,7 @@ const Projects = () => {
           ))}
         </tbody>
       </table>
+      {nextCursor && <button onClick={() => loadProjects(nextCursor)}>Load more</button>}
     </div>
   );
 };
@@ -1,7 +1,9 @@
 import axios from 'axios';
 
 const api = axios.create({
-  baseURL: import.meta.env.VITE_API_URL || 'http://localhost:8000'
+  baseURL: import.meta.env.VITE_API_URL || 'http://localhost:8000',
+  // Sends the read-after-write cookie so reads following a save see it before replicas do.
+  withCredentials: true
 });
 
 api.interceptors.request.use((config) => {
@@ -11,4 +13,17 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export const fetchPage = async <T,>(
+  path: string,
+  params: Record<string, string | number | undefined> = {}
+): Promise<Page<T>> => {
+  const res = await api.get(path, { params });
+  return { items: res.data, nextCursor: res.headers['x-next-cursor'] ?? null };
+};
+
 export default api;